@@ -0,0 +1,94 @@
+import argparse
+import logging
+import time
+
+import pandas as pd
+import sqlalchemy as sa
+
+from db_utility import dbTools
+
+BENCH_SCHEMA = "building_fixes_bench"
+
+
+def prepare_schema(engine: sa.Engine):
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"CREATE SCHEMA IF NOT EXISTS {BENCH_SCHEMA}"))
+        conn.execute(
+            sa.text(
+                "CREATE TABLE IF NOT EXISTS physical_objects (id serial PRIMARY KEY, city_id integer, "
+                "geometry geometry(Geometry, 4326), updated_at timestamptz DEFAULT now())"
+            )
+        )
+        conn.execute(
+            sa.text(
+                "CREATE TABLE IF NOT EXISTS buildings (id serial PRIMARY KEY, "
+                "physical_object_id integer UNIQUE REFERENCES physical_objects(id))"
+            )
+        )
+        conn.execute(
+            sa.text(
+                "CREATE TABLE IF NOT EXISTS functional_objects (id serial PRIMARY KEY, "
+                "physical_object_id integer REFERENCES physical_objects(id), updated_at timestamptz DEFAULT now())"
+            )
+        )
+
+
+def seed(engine: sa.Engine, rows: int):
+    # rows building-points with one service each, plus rows polygons the services are moved to
+    with engine.begin() as conn:
+        conn.execute(sa.text("TRUNCATE functional_objects, buildings, physical_objects RESTART IDENTITY"))
+        conn.execute(
+            sa.text(
+                "INSERT INTO physical_objects (city_id, geometry) "
+                "SELECT 1, ST_SetSRID(ST_MakePoint(30 + random(), 59 + random()), 4326) "
+                "FROM generate_series(1, :rows * 2)"
+            ).params(rows=rows)
+        )
+        conn.execute(sa.text("INSERT INTO buildings (physical_object_id) SELECT id FROM physical_objects"))
+        conn.execute(
+            sa.text(
+                "INSERT INTO functional_objects (physical_object_id) SELECT id FROM physical_objects WHERE id <= :rows"
+            ).params(rows=rows)
+        )
+    services = pd.DataFrame({"id": range(1, rows + 1), "physical_object_id": range(rows + 1, 2 * rows + 1)})
+    points = pd.DataFrame({"id": range(1, rows + 1), "physical_object_id": range(1, rows + 1)})
+    return services, points
+
+
+def run(sql_connection: str, rows: int, batch_size: int) -> dict:
+    url = sa.engine.make_url(sql_connection)
+    url = url.update_query_dict({"options": f"-csearch_path={BENCH_SCHEMA},public"})
+    db = dbTools.DBworker(url.render_as_string(hide_password=False), batch_size=batch_size)
+    prepare_schema(db.engine)
+
+    results = {}
+    for bulk in (False, True):
+        services, points = seed(db.engine, rows)
+        start = time.perf_counter()
+        db.upload_services(services, bulk=bulk)
+        upload_time = time.perf_counter() - start
+        start = time.perf_counter()
+        db.remove_building(points, bulk=bulk)
+        remove_time = time.perf_counter() - start
+        results["bulk" if bulk else "per-row"] = (upload_time, remove_time)
+
+    with db.engine.begin() as conn:
+        conn.execute(sa.text(f"DROP SCHEMA {BENCH_SCHEMA} CASCADE"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs bulk apply of building-point fixes on a local PostGIS")
+    parser.add_argument("sql_connection", help="PostgreSQL DSN of a scratch database with PostGIS installed")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args.sql_connection, args.rows, args.batch_size)
+    print(f"rows={args.rows} batch_size={args.batch_size}")
+    for mode, (upload_time, remove_time) in results.items():
+        print(f"{mode:>8}: upload_services {upload_time:8.3f} s, remove_building {remove_time:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
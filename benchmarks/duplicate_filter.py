@@ -0,0 +1,44 @@
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_duplicates
+from duplicated_services.search_and_clear import select_services_to_delete
+
+
+def legacy_select_services_to_delete(all_duplicates: pd.DataFrame) -> pd.DataFrame:
+    # Цикл из search_and_clear.main до векторизации
+    services_to_delete = pd.DataFrame()
+    for service_id in all_duplicates["city_service_type_id"].unique():
+        df = all_duplicates[all_duplicates["city_service_type_id"] == service_id]
+        for key, item in df.groupby("building_id"):
+            rows_to_delete = item[item["service_name"].str.endswith(" без названия)")]
+            if rows_to_delete.shape[0] == item.shape[0]:
+                rows_to_delete = rows_to_delete.head(1)
+            services_to_delete = pd.concat([services_to_delete, rows_to_delete.copy()], ignore_index=True)
+    return services_to_delete
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized vs per-group selection of duplicated services")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=5_000, help="The per-group loop is quadratic, so it runs on a smaller frame")
+    args = parser.parse_args()
+
+    df = make_duplicates(args.rows)
+    start = time.perf_counter()
+    services_to_delete, _ = select_services_to_delete(df)
+    print(f"vectorized: {args.rows} rows in {time.perf_counter() - start:.3f} s, {services_to_delete.shape[0]} to delete")
+
+    df = make_duplicates(args.legacy_rows)
+    start = time.perf_counter()
+    legacy = legacy_select_services_to_delete(df)
+    legacy_time = time.perf_counter() - start
+    vectorized, _ = select_services_to_delete(df)
+    same = set(legacy["functional_object_id"]) == set(vectorized["functional_object_id"])
+    print(f"legacy: {args.legacy_rows} rows in {legacy_time:.3f} s, same result as vectorized: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import logging
+import sys
+import time
+
+import pandas as pd
+import shapely
+import sqlalchemy as sa
+
+from benchmarks import synthetic
+from building_points.check_buildings import search_nearest_neighbor
+from db_utility import dbTools
+
+PARITY_SCHEMA = "building_fixes_parity"
+SYNTHETIC_CITY_NAME = "synthetic"
+
+
+def _mismatches(geopandas_result: pd.DataFrame, postgis_result: pd.DataFrame) -> pd.DataFrame:
+    merged = pd.merge(
+        pd.DataFrame(geopandas_result[["id", "closest_building_physical_id"]]),
+        postgis_result[["id", "closest_building_physical_id"]],
+        on="id",
+        how="outer",
+        suffixes=("_geopandas", "_postgis"),
+        indicator=True,
+    )
+    same = (merged["_merge"] == "both") & (
+        merged["closest_building_physical_id_geopandas"].fillna(-1)
+        == merged["closest_building_physical_id_postgis"].fillna(-1)
+    )
+    return merged[~same]
+
+
+def compare_engines(db: dbTools.DBworker, city: str, distance_limit: float) -> pd.DataFrame:
+    start = time.perf_counter()
+    gdf_buildings = db.download_buildings(city)
+    points = gdf_buildings[gdf_buildings.geometry.type == "Point"]
+    polygons = gdf_buildings[gdf_buildings.geometry.type.isin(["Polygon", "MultiPolygon"])]
+    geopandas_result = search_nearest_neighbor(points, polygons, distance_limit, db.get_city_local_crs(city), city)
+    geopandas_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    postgis_result = db.search_nearest_neighbor_in_db(city, distance_limit)
+    postgis_time = time.perf_counter() - start
+
+    print(f"{city}: geopandas {geopandas_time:.3f} s, postgis {postgis_time:.3f} s")
+    return _mismatches(geopandas_result, postgis_result)
+
+
+def load_synthetic_city(engine: sa.Engine, city: synthetic.SyntheticCity):
+    # Только таблицы и колонки, которые читает search_nearest_neighbor_in_db
+    buildings = city.buildings
+    center = shapely.box(*buildings.total_bounds).centroid
+    with engine.begin() as conn:
+        # все имена с явной схемой, чтобы ничего не разрешилось в public с настоящими таблицами
+        conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {PARITY_SCHEMA} CASCADE"))
+        conn.execute(sa.text(f"CREATE SCHEMA {PARITY_SCHEMA}"))
+        conn.execute(
+            sa.text(
+                f"CREATE TABLE {PARITY_SCHEMA}.cities (id integer PRIMARY KEY, name text, local_crs integer, "
+                "center geometry(Point, 4326))"
+            )
+        )
+        conn.execute(
+            sa.text(
+                f"CREATE TABLE {PARITY_SCHEMA}.physical_objects "
+                "(id integer PRIMARY KEY, city_id integer, geometry geometry(Geometry, 4326))"
+            )
+        )
+        conn.execute(sa.text(f"CREATE TABLE {PARITY_SCHEMA}.buildings (id integer PRIMARY KEY, physical_object_id integer)"))
+        conn.execute(
+            sa.text(
+                f"INSERT INTO {PARITY_SCHEMA}.cities VALUES (1, :name, :local_crs, ST_SetSRID(ST_MakePoint(:x, :y), 4326))"
+            ).params(name=SYNTHETIC_CITY_NAME, local_crs=city.local_crs, x=center.x, y=center.y)
+        )
+        conn.execute(
+            sa.text(
+                f"INSERT INTO {PARITY_SCHEMA}.physical_objects VALUES (:id, 1, ST_SetSRID(ST_GeomFromWKB(decode(:wkb, 'hex')), 4326))"
+            ),
+            [
+                {"id": int(id_), "wkb": wkb}
+                for id_, wkb in zip(buildings["physical_object_id"], shapely.to_wkb(buildings.geometry.to_numpy(), hex=True))
+            ],
+        )
+        conn.execute(
+            sa.text(f"INSERT INTO {PARITY_SCHEMA}.buildings VALUES (:id, :physical_object_id)"),
+            [
+                {"id": int(id_), "physical_object_id": int(physical_object_id)}
+                for id_, physical_object_id in zip(buildings["id"], buildings["physical_object_id"])
+            ],
+        )
+        conn.execute(sa.text(f"CREATE INDEX ON {PARITY_SCHEMA}.physical_objects USING gist (geometry)"))
+        conn.execute(sa.text(f"ANALYZE {PARITY_SCHEMA}.physical_objects"))
+
+
+def compare_engines_synthetic(
+    sql_connection: str, polygons: int, points: int, distance_limit: float, seed: int
+) -> pd.DataFrame:
+    """Runs both engines on a synthetic city loaded into the ``building_fixes_parity`` schema of a scratch database.
+
+    Overlapping synthetic polygons give points with several polygons at the same distance, so equal-distance ties
+    are checked as well.
+    """
+    url = sa.engine.make_url(sql_connection)
+    url = url.update_query_dict({"options": f"-csearch_path={PARITY_SCHEMA},public"})
+    db = dbTools.DBworker(url.render_as_string(hide_password=False))
+    city = synthetic.make_city(polygons=polygons, points=points, services=0, distance_limit=distance_limit, seed=seed)
+    try:
+        load_synthetic_city(db.engine, city)
+        buildings = city.buildings
+        geopandas_result = search_nearest_neighbor(
+            buildings[buildings.geometry.type == "Point"],
+            buildings[buildings.geometry.type == "Polygon"],
+            distance_limit,
+            city.local_crs,
+        )
+        postgis_result = db.search_nearest_neighbor_in_db(SYNTHETIC_CITY_NAME, distance_limit)
+    finally:
+        with db.engine.begin() as conn:
+            conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {PARITY_SCHEMA} CASCADE"))
+    print(f"synthetic city of {polygons} polygons and {points} points, seed {seed}")
+    return _mismatches(geopandas_result, postgis_result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the geopandas and PostGIS engines match building points alike")
+    parser.add_argument("sql_connection", help="PostgreSQL DSN of a database with cities, buildings and physical_objects")
+    parser.add_argument("cities", nargs="*")
+    parser.add_argument("--distance-limit", type=float, default=30)
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="Check on a synthetic city instead, the DSN should point to a scratch database with PostGIS installed",
+    )
+    parser.add_argument("--polygons", type=int, default=20_000)
+    parser.add_argument("--points", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.synthetic and not args.cities:
+        parser.error("give cities to check or --synthetic")
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.synthetic:
+        results = {
+            SYNTHETIC_CITY_NAME: compare_engines_synthetic(
+                args.sql_connection, args.polygons, args.points, args.distance_limit, args.seed
+            )
+        }
+    else:
+        db = dbTools.DBworker(args.sql_connection)
+        results = {city: compare_engines(db, city, args.distance_limit) for city in args.cities}
+    failed = False
+    for city, mismatches in results.items():
+        if mismatches.shape[0] > 0:
+            failed = True
+            print(f"{city}: {mismatches.shape[0]} building-point(s) matched differently")
+            print(mismatches.to_string(index=False))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
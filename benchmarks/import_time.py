@@ -0,0 +1,78 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = (
+    "duplicated_services.search_and_clear",
+    "building_points.check_buildings",
+    "building_points.batch_check_buildings",
+    "db_utility.dbTools",
+)
+HEAVY_MODULES = ("geopandas", "shapely", "geoalchemy2", "scipy", "sklearn", "asyncpg", "pyarrow")
+# То, что делает main() утилиты до первого обращения к базе: импорт, DBworker и сборка её запросов.
+# Одного импорта мало, модули, загружаемые при выполнении, тоже входят во время запуска
+RUN_PATHS = {
+    "duplicated_services.search_and_clear": (
+        "import pandas as pd\n"
+        "from db_utility import dbTools\n"
+        "from duplicated_services import search_and_clear\n"
+        "db = dbTools.DBworker('postgresql+psycopg2://user@localhost/db')\n"
+        "dbTools.same_services_query([1], 'city').compile(dialect=db.engine.dialect)\n"
+        "dbTools.delete_services_query([1]).compile(dialect=db.engine.dialect)\n"
+        "row = {'service_name': 'x', 'building_id': 1, 'city_service_type': 'x', 'city_service_type_id': 1}\n"
+        "search_and_clear.select_services_to_delete(pd.DataFrame([{**row, 'functional_object_id': 1}]))\n"
+    ),
+}
+
+
+def measure(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def top_imports(module: str, top: int) -> list:
+    # -X importtime пишет в stderr: self [us] | cumulative [us] | имя
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        if name.startswith("   ") and not name.startswith("     "):
+            # только импорты первого уровня вложенности, иначе пакеты посчитаются по нескольку раз
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def loaded_heavy_modules(code: str) -> list:
+    code = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import time of the utilities")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = measure("import sys", args.repeat)
+    print(f"interpreter startup: {baseline:.3f} s")
+    for module in args.modules:
+        print(f"{module}: import {measure(f'import {module}', args.repeat) - baseline:.3f} s over startup")
+        print(f"    heavy modules loaded: {', '.join(loaded_heavy_modules(f'import {module}')) or 'none'}")
+        for seconds, name in top_imports(module, args.top):
+            print(f"    {seconds:7.3f} s  {name}")
+        if module in RUN_PATHS:
+            print(f"    run path: {measure(RUN_PATHS[module], args.repeat) - baseline:.3f} s over startup")
+            print(f"    heavy modules loaded by the run path: {', '.join(loaded_heavy_modules(RUN_PATHS[module])) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import argparse
+import logging
+import sys
+
+from db_utility import dbTools
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the statement timeout applies to COPY downloads and uploads")
+    parser.add_argument("sql_connection", help="PostgreSQL DSN, the PgBouncer one to check the pgbouncer mode")
+    parser.add_argument("--statement-timeout", type=int, default=30000, help="Timeout to set, in milliseconds")
+    parser.add_argument("--pgbouncer", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    db = dbTools.DBworker(args.sql_connection, statement_timeout=args.statement_timeout, pgbouncer=args.pgbouncer)
+    timeout = db.copy_statement_timeout()
+    print(f"statement_timeout in a COPY transaction: {timeout} ms, expected {args.statement_timeout} ms")
+    sys.exit(0 if timeout == args.statement_timeout else 1)
+
+
+if __name__ == "__main__":
+    main()
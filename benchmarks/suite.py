@@ -0,0 +1,157 @@
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+import typing
+from datetime import datetime, timezone
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from benchmarks import bulk_apply, synthetic
+from building_points.check_buildings import (
+    reassign_services,
+    search_k_nearest_buildings,
+    search_nearest_neighbor,
+    search_nearest_neighbor_tiled,
+)
+from duplicated_services.search_and_clear import select_services_to_delete
+
+
+def _git_revision() -> typing.Tuple[str, bool]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def _measure(func: typing.Callable[[], typing.Any], repeat: int) -> typing.Tuple[typing.List[float], typing.Any]:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def cases(city: synthetic.SyntheticCity, distance_limit: float, tile_size: float) -> typing.Dict[str, typing.Callable]:
+    buildings = city.buildings
+    points = buildings[buildings.geometry.type == "Point"]
+    polygons = buildings[buildings.geometry.type == "Polygon"]
+    matched = search_nearest_neighbor(points, polygons, distance_limit, city.local_crs).dropna(
+        subset=["closest_building_physical_id"]
+    )
+
+    def load_polygons(bbox):
+        return polygons.iloc[polygons.sindex.query(shapely.box(*bbox))]
+
+    return {
+        "search_nearest_neighbor": lambda: search_nearest_neighbor(points, polygons, distance_limit, city.local_crs),
+        "search_nearest_neighbor_tiled": lambda: search_nearest_neighbor_tiled(
+            points, load_polygons, distance_limit, tile_size, city.local_crs
+        ),
+        "search_k_nearest_buildings": lambda: search_k_nearest_buildings(
+            points, polygons, 5, distance_limit, city.local_crs
+        ),
+        "reassign_services": lambda: reassign_services(city.services, matched),
+        "select_services_to_delete": lambda: select_services_to_delete(city.duplicates),
+    }
+
+
+def load_baseline(path: str, commit: str, params: dict) -> typing.Dict[str, float]:
+    baseline = {}
+    with open(path, encoding="UTF-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["commit"] == commit and record["params"] == params:
+                baseline[record["case"]] = record["min_seconds"]
+    return baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the building_points and duplicated_services hot paths on a synthetic city"
+    )
+    parser.add_argument("--polygons", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=5_000)
+    parser.add_argument("--services", type=int, default=50_000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--distance-limit", type=float, default=30)
+    parser.add_argument("--tile-size", type=float, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", nargs="*", help="Run only these cases")
+    parser.add_argument(
+        "--sql-connection", help="DSN of a scratch PostGIS database, adds the bulk_apply case with --services rows"
+    )
+    parser.add_argument("--output", help="JSON lines file to append the results to")
+    parser.add_argument("--baseline", help="Commit from --output to compare the results with")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    params = {
+        "polygons": args.polygons,
+        "points": args.points,
+        "services": args.services,
+        "duplicate_rate": args.duplicate_rate,
+        "distance_limit": args.distance_limit,
+        "tile_size": args.tile_size,
+        "seed": args.seed,
+    }
+    city = synthetic.make_city(
+        polygons=args.polygons,
+        points=args.points,
+        services=args.services,
+        duplicate_rate=args.duplicate_rate,
+        distance_limit=args.distance_limit,
+        seed=args.seed,
+    )
+    benchmarks = cases(city, args.distance_limit, args.tile_size)
+    if args.sql_connection:
+        benchmarks["bulk_apply"] = lambda: bulk_apply.run(args.sql_connection, args.services, 10000)
+    if args.cases:
+        benchmarks = {name: func for name, func in benchmarks.items() if name in args.cases}
+
+    commit, dirty = _git_revision()
+    baseline = load_baseline(args.output, args.baseline, params) if args.output and args.baseline else {}
+    records = []
+    for name, func in benchmarks.items():
+        times, result = _measure(func, args.repeat)
+        record = {
+            "case": name,
+            "commit": commit,
+            "dirty": dirty,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "versions": {"pandas": pd.__version__, "geopandas": gpd.__version__, "shapely": shapely.__version__},
+            "params": params,
+            "min_seconds": round(min(times), 4),
+            "median_seconds": round(statistics.median(times), 4),
+        }
+        if name == "bulk_apply":
+            # время каждого режима из последнего прогона, общее время включает подготовку данных
+            record["modes"] = {mode: [round(value, 4) for value in values] for mode, values in result.items()}
+        records.append(record)
+        comparison = ""
+        if name in baseline:
+            comparison = f", {record['min_seconds'] / baseline[name]:.2f}x of {args.baseline}"
+        print(f"{name:>30}: min {record['min_seconds']:8.3f} s, median {record['median_seconds']:8.3f} s{comparison}")
+
+    if args.output:
+        with open(args.output, "a", encoding="UTF-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import typing
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+UNNAMED_SERVICE_NAME = "Объект (объект без названия)"
+
+
+class SyntheticCity(typing.NamedTuple):
+    buildings: gpd.GeoDataFrame
+    services: gpd.GeoDataFrame
+    duplicates: pd.DataFrame
+    local_crs: int
+
+
+def make_city(
+    polygons: int = 100_000,
+    points: int = 5_000,
+    services: int = 50_000,
+    duplicate_rate: float = 0.1,
+    unnamed_share: float = 0.5,
+    service_types: int = 20,
+    near_share: float = 0.8,
+    distance_limit: float = 30,
+    seed: int = 0,
+    local_crs: int = 32636,
+    origin: typing.Tuple[float, float] = (350_000, 6_650_000),
+) -> SyntheticCity:
+    """Generates a city shaped like the buildings and services the tools download.
+
+    ``polygons`` square buildings are scattered over an area with about 50 m between them, ``points`` building-points
+    are placed, ``near_share`` of them within ``distance_limit`` of a polygon. ``services`` are attached to random
+    buildings, ``duplicate_rate`` of them repeat the service type of another service in the same building.
+    The same arguments always give the same city.
+    """
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(polygons) * 50
+    centers = np.asarray(origin) + rng.random((polygons, 2)) * side
+    sizes = rng.uniform(8, 20, polygons)
+    polygon_geometry = shapely.box(
+        centers[:, 0] - sizes / 2, centers[:, 1] - sizes / 2, centers[:, 0] + sizes / 2, centers[:, 1] + sizes / 2
+    )
+
+    near = rng.random(points) < near_share
+    anchors = centers[rng.integers(0, polygons, points)]
+    angle = rng.uniform(0, 2 * np.pi, points)
+    offset = np.where(near, sizes.mean() / 2 + rng.uniform(0, distance_limit * 0.8, points), 0)
+    point_xy = np.where(
+        near[:, None],
+        anchors + np.column_stack([np.cos(angle), np.sin(angle)]) * offset[:, None],
+        np.asarray(origin) + rng.random((points, 2)) * side,
+    )
+    point_geometry = shapely.points(point_xy)
+
+    buildings = gpd.GeoDataFrame(
+        {
+            "id": np.arange(1, polygons + points + 1),
+            "physical_object_id": np.arange(1, polygons + points + 1),
+        },
+        geometry=np.concatenate([polygon_geometry, point_geometry]),
+        crs=local_crs,
+    ).to_crs(4326)
+
+    # Сервисы: сначала уникальные по (тип, здание), затем доля повторов тех же пар
+    duplicated = int(services * duplicate_rate)
+    unique = services - duplicated
+    building_id = rng.integers(1, polygons + points + 1, unique)
+    service_type_id = rng.integers(1, service_types + 1, unique)
+    repeat = rng.integers(0, max(unique, 1), duplicated)
+    building_id = np.concatenate([building_id, building_id[repeat]])
+    service_type_id = np.concatenate([service_type_id, service_type_id[repeat]])
+    unnamed = rng.random(services) < unnamed_share
+
+    services_gdf = gpd.GeoDataFrame(
+        {"id": np.arange(1, services + 1), "physical_object_id": building_id},
+        geometry=buildings.geometry.to_numpy()[building_id - 1],
+        crs=4326,
+    )
+    duplicates = pd.DataFrame(
+        {
+            "service_name": np.where(unnamed, UNNAMED_SERVICE_NAME, "Объект"),
+            "building_id": building_id,
+            "city_service_type": "Тип " + pd.Series(service_type_id).astype(str),
+            "city_service_type_id": service_type_id,
+            "functional_object_id": np.arange(1, services + 1),
+        }
+    )
+    # Как в представлении all_services: только пары (тип, здание), встречающиеся больше одного раза
+    duplicates = duplicates[duplicates.duplicated(["city_service_type_id", "building_id"], keep=False)]
+    return SyntheticCity(buildings, services_gdf, duplicates.reset_index(drop=True), local_crs)
+
+
+def make_duplicates(rows: int, service_types: int = 20, unnamed_share: float = 0.5, seed: int = 0) -> pd.DataFrame:
+    """Dense duplicates: about three services per building, for timing the duplicate filter alone."""
+    rng = np.random.default_rng(seed)
+    service_type_id = rng.integers(1, service_types + 1, rows)
+    building_id = rng.integers(1, max(rows // 3, 2), rows)
+    unnamed = rng.random(rows) < unnamed_share
+    return pd.DataFrame(
+        {
+            "service_name": np.where(unnamed, UNNAMED_SERVICE_NAME, "Объект"),
+            "building_id": building_id,
+            "city_service_type": "Тип " + pd.Series(service_type_id).astype(str),
+            "city_service_type_id": service_type_id,
+            "functional_object_id": np.arange(rows),
+        }
+    )
@@ -0,0 +1,197 @@
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import time
+import typing
+
+from building_points.check_buildings import fix_city, fix_city_incremental
+from db_utility import dbTools, metrics, snapshots
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+# Каждый процесс держит один DBworker с одним соединением на всё время работы пула
+_worker_state = {}
+
+
+def _init_worker(
+    sql_connection: str,
+    batch_size: int,
+    statement_timeout: typing.Optional[int],
+    pgbouncer: bool,
+    download_semaphore,
+):
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    _worker_state["db"] = dbTools.DBworker(
+        sql_connection,
+        batch_size=batch_size,
+        pool_size=1,
+        max_overflow=0,
+        statement_timeout=statement_timeout,
+        pgbouncer=pgbouncer,
+    )
+    _worker_state["snapshot_cache"] = snapshots.SnapshotCache("data")
+    _worker_state["watermarks"] = snapshots.WatermarkStore("data")
+    _worker_state["journal"] = snapshots.ApplyJournal("data")
+    _worker_state["download_semaphore"] = download_semaphore
+
+
+def _fix_city_in_worker(
+    city: str,
+    distance_limit: float,
+    dry_run: bool,
+    from_file: bool,
+    save_data: bool,
+    engine: str,
+    tile_size: typing.Optional[float],
+    incremental: bool,
+) -> dict:
+    handler = logging.FileHandler(
+        os.path.join(os.getcwd(), f"building_fixes_{city}.log"), mode="w", encoding="UTF-8"
+    )
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    start = time.perf_counter()
+    try:
+        if incremental:
+            summary = fix_city_incremental(
+                _worker_state["db"],
+                _worker_state["watermarks"],
+                city,
+                distance_limit,
+                dry_run,
+                tile_size=tile_size or 1000,
+                download_lock=_worker_state["download_semaphore"],
+                journal=_worker_state["journal"],
+            )
+        else:
+            summary = fix_city(
+                _worker_state["db"],
+                _worker_state["snapshot_cache"],
+                city,
+                distance_limit,
+                dry_run,
+                from_file,
+                save_data,
+                download_lock=_worker_state["download_semaphore"],
+                engine=engine,
+                tile_size=tile_size,
+                journal=_worker_state["journal"],
+            )
+        summary["status"] = "ok"
+    except Exception as err:
+        logging.exception(f"Failed to fix building-points in {city} city")
+        summary = {"city": city, "status": "failed", "error": str(err)}
+    finally:
+        root_logger.removeHandler(handler)
+        handler.close()
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    # этапы города собираются в главном процессе и выгружаются одним файлом
+    summary["stages"] = metrics.collector.drain()
+    return summary
+
+
+def main():
+    with open(os.path.join(os.getcwd(), "config.json"), encoding="UTF-8") as f:
+        config_imputation = json.load(f)
+        cities = config_imputation["cities"]
+        sql_connection = config_imputation["sqlConnection"]
+        distance_limit = config_imputation["distance_limit"]
+        dry_run = config_imputation["dry_run"]
+        from_file = config_imputation["from_file"]
+        save_data = config_imputation["save_data"]
+        batch_size = config_imputation.get("batch_size", 10000)
+        engine = config_imputation.get("engine", "geopandas")
+        tile_size = config_imputation.get("tile_size")
+        statement_timeout = config_imputation.get("statement_timeout")
+        pgbouncer = config_imputation.get("pgbouncer", False)
+        incremental = config_imputation.get("incremental", False)
+        metrics_file = config_imputation.get("metrics_file")
+        workers = config_imputation.get("workers", os.cpu_count())
+        max_parallel_downloads = config_imputation.get("max_parallel_downloads", 2)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(
+                os.path.join(os.getcwd(), "building_fixes_batch.log"), mode="w", encoding="UTF-8"
+            ),
+            logging.StreamHandler(),
+        ],
+    )
+
+    if cities == "all":
+        cities = dbTools.DBworker(sql_connection, pool_size=1, max_overflow=0).get_city_names()
+    logging.info(
+        f"Fixing building-points in {len(cities)} cities with {workers} workers, "
+        f"at most {max_parallel_downloads} downloading at once."
+    )
+
+    # spawn, чтобы дочерние процессы не наследовали соединения и обработчики логов родителя
+    context = multiprocessing.get_context("spawn")
+    download_semaphore = context.BoundedSemaphore(max_parallel_downloads)
+    summaries = []
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(sql_connection, batch_size, statement_timeout, pgbouncer, download_semaphore),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _fix_city_in_worker,
+                    city,
+                    distance_limit,
+                    dry_run,
+                    from_file,
+                    save_data,
+                    engine,
+                    tile_size,
+                    incremental,
+                ): city
+                for city in cities
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as err:
+                    # ошибки города ловит сам воркер, сюда попадают упавший процесс (BrokenProcessPool) и ошибки pickle
+                    summary = {
+                        "city": futures[future],
+                        "status": "failed",
+                        "error": str(err) or type(err).__name__,
+                        "stages": [],
+                    }
+                if summary["status"] == "ok":
+                    logging.info(
+                        f"{summary['city']}: {summary['building_points']} building-point(s), "
+                        f"{summary['no_neighbors']} without neighbors, {summary['services_transferred']} service(s) "
+                        f"transferred in {summary['seconds']} s."
+                    )
+                else:
+                    logging.error(f"{summary['city']}: failed with {summary['error']}")
+                summaries.append(summary)
+    finally:
+        # сводка пишется и при прерванном запуске, города без результата отмечаются как failed
+        finished = {summary["city"] for summary in summaries}
+        summaries += [
+            {"city": city, "status": "failed", "error": "not finished", "stages": []}
+            for city in cities
+            if city not in finished
+        ]
+        summaries.sort(key=lambda summary: cities.index(summary["city"]))
+        stages = [stage for summary in summaries for stage in summary.pop("stages")]
+        if metrics_file:
+            metrics.collector.export(os.path.join(os.getcwd(), metrics_file), stages)
+        with open(os.path.join(os.getcwd(), "building_fixes_summary.json"), "w", encoding="UTF-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+    failed = [summary["city"] for summary in summaries if summary["status"] != "ok"]
+    logging.info(f"Done! {len(summaries) - len(failed)} cities fixed, {len(failed)} failed: {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
 import json
 import logging
 import os
+import typing
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from sklearn.neighbors import NearestNeighbors
+import shapely
+
+from db_utility import dbTools, metrics, snapshots
+
+if typing.TYPE_CHECKING:
+    from db_utility import asyncTools
+
+TOOL = "building_points"
+
 
-from db_utility import dbTools
+def _polygons_to_local_crs(
+    polygons: gpd.GeoDataFrame, local_crs, polygons_cache: typing.Optional[dict]
+) -> gpd.GeoDataFrame:
+    if polygons_cache is None:
+        return polygons.to_crs(local_crs)
+    cached = polygons_cache.get(local_crs)
+    if cached is not None:
+        cached = cached[cached.index.isin(polygons["id"])]
+    missing = polygons if cached is None else polygons[~polygons["id"].isin(cached.index)]
+    projected = missing.geometry.to_crs(local_crs).set_axis(missing["id"])
+    cached = projected if cached is None else pd.concat([cached, projected])
+    # В кэше остаются только полигоны последнего вызова: соседний тайл берёт из него общую полосу шириной radius,
+    # а память не растёт с числом тайлов
+    polygons_cache[local_crs] = cached
+    return gpd.GeoDataFrame(
+        polygons.drop(columns=polygons.geometry.name),
+        geometry=cached.loc[polygons["id"]].to_numpy(),
+        crs=local_crs,
+    )
 
 
 def search_nearest_neighbor(
-    points_data: gpd.GeoDataFrame, search_in_data: gpd.GeoDataFrame, radius
+    points_data: gpd.GeoDataFrame,
+    search_in_data: gpd.GeoDataFrame,
+    radius,
+    local_crs: typing.Optional[int] = None,
+    city: typing.Optional[str] = None,
+    polygons_cache: typing.Optional[dict] = None,
 ) -> gpd.GeoDataFrame:
-    search_in_data = search_in_data.to_crs("EPSG:3857")
-    points_data = points_data.to_crs("EPSG:3857")
+    """``polygons_cache`` keeps the reprojected polygons of the previous call, the tiled search passes one dict
+    to all its tiles so the polygons shared by neighboring tiles are reprojected once."""
+    if local_crs is None:
+        local_crs = points_data.estimate_utm_crs()
+    with metrics.stage("reproject", tool=TOOL, city=city) as stage:
+        points_data = points_data.to_crs(local_crs)
+
+        # Берём только полигоны в охвате точек, расширенном на radius, остальные не перепроецируем
+        minx, miny, maxx, maxy = points_data.total_bounds
+        search_area = (
+            gpd.GeoSeries([shapely.box(minx - radius, miny - radius, maxx + radius, maxy + radius)], crs=local_crs)
+            .segmentize(max(radius, 1))
+            .to_crs(search_in_data.crs)
+        )
+        candidates = np.sort(search_in_data.sindex.query(search_area.iloc[0]))
+        search_in_data = _polygons_to_local_crs(search_in_data.iloc[candidates], local_crs, polygons_cache)
+        stage["rows"] = points_data.shape[0] + search_in_data.shape[0]
+
     logging.info("Searching for building-point's neighbors")
-    join = gpd.sjoin_nearest(
-        points_data,
-        search_in_data,
-        how="inner",
-        max_distance=radius,
-        distance_col="dist",
-    )
+    with metrics.stage("sjoin", tool=TOOL, city=city) as stage:
+        join = gpd.sjoin_nearest(
+            points_data,
+            search_in_data,
+            how="inner",
+            max_distance=radius,
+            distance_col="dist",
+        )
+        stage["rows"] = points_data.shape[0]
+    # sjoin_nearest возвращает все равноудалённые полигоны, берём с меньшим id, как и движок postgis
+    join = join.sort_values(["dist", "physical_object_id_right"], kind="stable")
+    join = join[~join.index.duplicated()]
     points_data["closest_building_physical_id"] = join["physical_object_id_right"]
     logging.info("Done searching neighbors!\n")
     return points_data
 
 
+def search_nearest_neighbor_tiled(
+    points_data: gpd.GeoDataFrame,
+    load_polygons: typing.Callable[[typing.Tuple[float, float, float, float]], gpd.GeoDataFrame],
+    radius,
+    tile_size: float,
+    local_crs: typing.Optional[int] = None,
+    city: typing.Optional[str] = None,
+) -> gpd.GeoDataFrame:
+    if local_crs is None:
+        local_crs = points_data.estimate_utm_crs()
+    local_points = points_data.geometry.to_crs(local_crs)
+    tiles = pd.DataFrame(
+        {"x": np.floor(local_points.x / tile_size), "y": np.floor(local_points.y / tile_size)},
+        index=points_data.index,
+    )
+    logging.info(f"Searching for building-point's neighbors in {tiles.drop_duplicates().shape[0]} tile(s)")
+    results = []
+    polygons_cache = {}
+    for (tile_x, tile_y), tile in tiles.groupby(["x", "y"]):
+        # Полигоны тайла берутся с запасом radius, чтобы не потерять соседей точек у края тайла
+        tile_bounds = (
+            gpd.GeoSeries(
+                [
+                    shapely.box(
+                        tile_x * tile_size - radius,
+                        tile_y * tile_size - radius,
+                        (tile_x + 1) * tile_size + radius,
+                        (tile_y + 1) * tile_size + radius,
+                    )
+                ],
+                crs=local_crs,
+            )
+            .segmentize(max(radius, 1))
+            .to_crs(4326)
+            .total_bounds
+        )
+        polygons = load_polygons(tuple(tile_bounds))
+        results.append(
+            search_nearest_neighbor(points_data.loc[tile.index], polygons, radius, local_crs, city, polygons_cache)
+        )
+    return pd.concat(results).reindex(points_data.index)
+
+
+def search_k_nearest_buildings(
+    points_data: gpd.GeoDataFrame,
+    search_in_data: gpd.GeoDataFrame,
+    k: int,
+    radius: float,
+    local_crs: typing.Optional[int] = None,
+    workers: int = -1,
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Finds up to ``k`` buildings of ``search_in_data`` with centroids within ``radius`` meters of each point.
+
+    Returns two ``(len(points_data), k)`` arrays sorted by distance: distances in meters and ``physical_object_id``
+    of the buildings. Missing neighbors have an infinite distance and id -1. ``workers`` is passed to
+    ``cKDTree.query``, -1 uses all CPUs.
+    """
+    from scipy.spatial import cKDTree
+
+    if local_crs is None:
+        local_crs = points_data.estimate_utm_crs()
+    points = shapely.get_coordinates(shapely.centroid(points_data.geometry.to_crs(local_crs).array))
+    buildings = shapely.get_coordinates(shapely.centroid(search_in_data.geometry.to_crs(local_crs).array))
+    distances, indices = cKDTree(buildings).query(
+        points, k=k, distance_upper_bound=radius, workers=workers
+    )
+    distances, indices = distances.reshape(len(points), k), indices.reshape(len(points), k)
+    # cKDTree отмечает отсутствующих соседей индексом len(buildings)
+    physical_object_ids = np.append(search_in_data["physical_object_id"].to_numpy(dtype=np.int64), -1)[indices]
+    return distances, physical_object_ids
+
+
+def reassign_services(services: pd.DataFrame, points: pd.DataFrame) -> pd.DataFrame:
+    closest_buildings = points.drop_duplicates("physical_object_id").set_index("physical_object_id")[
+        "closest_building_physical_id"
+    ]
+    services = services[services["physical_object_id"].isin(closest_buildings.index)].copy()
+    services["from_physical_object_id"] = services["physical_object_id"]
+    services["physical_object_id"] = services["physical_object_id"].map(closest_buildings).astype(int)
+    return services
+
+
+def load_city_table(
+    db: dbTools.DBworker,
+    snapshot_cache: snapshots.SnapshotCache,
+    city: str,
+    table: str,
+    from_file: bool,
+    save_data: bool,
+) -> gpd.GeoDataFrame:
+    if from_file:
+        return snapshot_cache.read(city, table)
+    download = db.download_buildings if table == "buildings" else db.download_services
+    if not save_data:
+        return download(city)
+    watermark = snapshot_cache.watermark(city, table)
+    # время сервера до скачивания, чтобы изменения во время скачивания попали в следующий запуск
+    download_started = db.get_server_time()
+    if watermark is None:
+        gdf = download(city)
+        snapshot_cache.write(city, table, gdf, download_started)
+        return gdf
+    # в снапшоте уже есть город, догружаем только изменённые с прошлого раза строки
+    changed = download(city, updated_since=watermark)
+    db_table = "buildings" if table == "buildings" else "functional_objects"
+    return snapshot_cache.update(city, table, changed, db.get_city_object_ids(db_table, city), download_started)
+
+
 def main():
     with open(os.path.join(os.getcwd(), "config.json"), encoding="UTF-8") as f:
         config_imputation = json.load(f)
@@ -36,6 +202,14 @@ def main():
         dry_run = config_imputation["dry_run"]
         from_file = config_imputation["from_file"]
         save_data = config_imputation["save_data"]
+        batch_size = config_imputation.get("batch_size", 10000)
+        engine = config_imputation.get("engine", "geopandas")
+        tile_size = config_imputation.get("tile_size")
+        statement_timeout = config_imputation.get("statement_timeout")
+        pgbouncer = config_imputation.get("pgbouncer", False)
+        async_download = config_imputation.get("async_download", False)
+        incremental = config_imputation.get("incremental", False)
+        metrics_file = config_imputation.get("metrics_file")
 
     log_file_name = f"building_fixes_{city}.log"
     logging.basicConfig(
@@ -49,36 +223,314 @@ def main():
         ],
     )
 
-    db = dbTools.DBworker(sql_connection)
-    gdf_services: gpd.GeoDataFrame
-    gdf_buildings: gpd.GeoDataFrame
-    if not from_file:
-        gdf_buildings = db.download_buildings(city,save_data)
-        gdf_services = db.download_services(city,save_data)
+    db = dbTools.DBworker(
+        sql_connection, batch_size=batch_size, statement_timeout=statement_timeout, pgbouncer=pgbouncer
+    )
+    snapshot_cache = snapshots.SnapshotCache("data")
+    journal = snapshots.ApplyJournal("data")
+    summaries = []
+    if incremental:
+        fix_city_incremental(
+            db,
+            snapshots.WatermarkStore("data"),
+            city,
+            distance_limit,
+            dry_run,
+            tile_size=tile_size or 1000,
+            journal=journal,
+        )
+    elif async_download and engine == "geopandas" and not (from_file or save_data or tile_size):
+        summaries = asyncio.run(
+            fix_cities_async(
+                sql_connection,
+                db,
+                [city],
+                distance_limit,
+                dry_run,
+                statement_timeout=statement_timeout,
+                pgbouncer=pgbouncer,
+                journal=journal,
+            )
+        )
+    else:
+        if async_download:
+            logging.warning(
+                "async_download works only with the geopandas engine without snapshots and tiles, ignoring it"
+            )
+        fix_city(
+            db,
+            snapshot_cache,
+            city,
+            distance_limit,
+            dry_run,
+            from_file,
+            save_data,
+            engine=engine,
+            tile_size=tile_size,
+            journal=journal,
+        )
+    if metrics_file:
+        metrics.collector.export(os.path.join(os.getcwd(), metrics_file))
+    # fix_cities_async ловит ошибки городов в сводку, а запуск должен завершиться с ошибкой, как и без async_download
+    failed = [summary for summary in summaries if summary["status"] == "failed"]
+    if failed:
+        raise RuntimeError(f"Failed to fix building-points in {city} city: {failed[0]['error']}")
+
+
+def apply_fixes(
+    db: dbTools.DBworker,
+    journal: typing.Optional[snapshots.ApplyJournal],
+    city: str,
+    services: pd.DataFrame,
+    points: pd.DataFrame,
+    completed_chunks: int = 0,
+    batch_size: typing.Optional[int] = None,
+):
+    # План записывается до первого изменения в БД, после каждого чанка сохраняется число завершённых
+    batch_size = batch_size or db.batch_size
+    if journal is not None and completed_chunks == 0:
+        journal.start(city, services, points, batch_size)
+    with metrics.stage("apply", tool=TOOL, city=city) as stage:
+        db.apply_building_fixes(
+            services,
+            points,
+            batch_size=batch_size,
+            completed_chunks=completed_chunks,
+            on_chunk_committed=None if journal is None else lambda chunks: journal.commit_chunk(city, chunks),
+        )
+        stage["rows"] = services.shape[0] + points.shape[0]
+    if journal is not None:
+        journal.finish(city)
+
+
+def _resume_pending(journal: typing.Optional[snapshots.ApplyJournal], city: str, dry_run: bool) -> bool:
+    if journal is None or not journal.pending(city):
+        return False
+    if dry_run:
+        # пробный запуск ничего не пишет в базу, в том числе не доводит прерванное применение
+        logging.warning(f"Found an interrupted apply of {city} city, it is not resumed in a dry run")
+        return False
+    return True
+
+
+def resume_apply(db: dbTools.DBworker, journal: snapshots.ApplyJournal, city: str) -> dict:
+    services, points, batch_size, completed_chunks = journal.load(city)
+    logging.warning(
+        f"Found an interrupted apply of {city} city, resuming it after {completed_chunks} committed chunk(s). "
+        f"Run the utility again to check the city anew."
+    )
+    # чанки считаются от размера, с которым применение было начато
+    apply_fixes(db, journal, city, services, points, completed_chunks, batch_size)
+    return {
+        "city": city,
+        "building_points": points.shape[0],
+        "no_neighbors": 0,
+        "services_transferred": services.shape[0],
+        "resumed": True,
+    }
+
+
+def fix_city_incremental(
+    db: dbTools.DBworker,
+    watermarks: snapshots.WatermarkStore,
+    city: str,
+    distance_limit: float,
+    dry_run: bool,
+    tile_size: float = 1000,
+    download_lock: typing.ContextManager = contextlib.nullcontext(),
+    journal: typing.Optional[snapshots.ApplyJournal] = None,
+) -> dict:
+    """Re-evaluates only building-points that may have changed their match since the city's last run.
+
+    The first run of a city checks all of its building-points. The watermark is moved only by successful
+    runs that are not dry.
+    """
+    if _resume_pending(journal, city, dry_run):
+        # водяной знак не сдвигается, следующий запуск проверит изменения с прошлого успешного
+        return resume_apply(db, journal, city)
+    watermark = watermarks.get(city)
+    # время сервера до скачивания, чтобы изменения во время запуска попали в следующий
+    run_started = db.get_server_time()
+    if watermark is None:
+        logging.info(f"No watermark for {city} city, checking all building-points")
+        summary = fix_city(
+            db, None, city, distance_limit, dry_run, False, False, download_lock=download_lock, journal=journal
+        )
+    else:
+        with download_lock, metrics.stage("download", tool=TOOL, city=city, table="changed") as stage:
+            gdf_points = db.download_points_to_recheck(city, watermark, distance_limit)
+            gdf_services = db.download_services(city, physical_object_ids=gdf_points["physical_object_id"])
+            local_crs = db.get_city_local_crs(city)
+            stage["rows"] = gdf_points.shape[0] + gdf_services.shape[0]
+        summary = fix_city(
+            db,
+            None,
+            city,
+            distance_limit,
+            dry_run,
+            False,
+            False,
+            tile_size=tile_size,
+            preloaded=(gdf_points, gdf_services, local_crs),
+            journal=journal,
+        )
+    if not dry_run:
+        watermarks.set(city, run_started)
+    return summary
+
+
+async def fix_city_async(
+    adb: asyncTools.AsyncDBworker,
+    db: dbTools.DBworker,
+    city: str,
+    distance_limit: float,
+    dry_run: bool,
+    journal: typing.Optional[snapshots.ApplyJournal] = None,
+) -> dict:
+    if _resume_pending(journal, city, dry_run):
+        return await asyncio.to_thread(resume_apply, db, journal, city)
+    # Здания, сервисы и СК города скачиваются одновременно, поиск соседей и запись идут в отдельном потоке
+    with metrics.stage("download", tool=TOOL, city=city, table="all") as stage:
+        gdf_buildings, gdf_services, local_crs = await adb.download_city(city)
+        stage["rows"] = gdf_buildings.shape[0] + gdf_services.shape[0]
+    return await asyncio.to_thread(
+        fix_city,
+        db,
+        None,
+        city,
+        distance_limit,
+        dry_run,
+        False,
+        False,
+        preloaded=(gdf_buildings, gdf_services, local_crs),
+        journal=journal,
+    )
+
+
+async def fix_cities_async(
+    sql_connection: str,
+    db: dbTools.DBworker,
+    cities: typing.List[str],
+    distance_limit: float,
+    dry_run: bool,
+    max_concurrency: int = 4,
+    statement_timeout: typing.Optional[int] = None,
+    pgbouncer: bool = False,
+    journal: typing.Optional[snapshots.ApplyJournal] = None,
+) -> typing.List[dict]:
+    """Fixes building-points of several cities in one event loop, at most ``max_concurrency`` cities at once."""
+    # asyncpg нужен только этому режиму
+    from db_utility import asyncTools
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(city: str) -> dict:
+        async with semaphore:
+            try:
+                summary = await fix_city_async(adb, db, city, distance_limit, dry_run, journal)
+                summary["status"] = "ok"
+            except Exception as err:
+                logging.exception(f"Failed to fix building-points in {city} city")
+                summary = {"city": city, "status": "failed", "error": str(err)}
+            return summary
+
+    # на город приходится по два запроса скачивания
+    async with asyncTools.AsyncDBworker(
+        sql_connection, pool_size=2 * max_concurrency, statement_timeout=statement_timeout, pgbouncer=pgbouncer
+    ) as adb:
+        return await asyncio.gather(*(run(city) for city in cities))
+
+
+def load_polygons_in_bbox(
+    db: dbTools.DBworker,
+    snapshot_cache: snapshots.SnapshotCache,
+    city: str,
+    bbox: typing.Tuple[float, float, float, float],
+    from_file: bool,
+) -> gpd.GeoDataFrame:
+    with metrics.stage("download", tool=TOOL, city=city, table="buildings") as stage:
+        if from_file:
+            gdf = snapshot_cache.read(city, "buildings", bbox=bbox)
+            gdf = gdf[gdf.geometry.type.isin(["Polygon", "MultiPolygon"])]
+        else:
+            gdf = db.download_buildings(city, geometry_types=["ST_Polygon", "ST_MultiPolygon"], bbox=bbox)
+        stage["rows"] = gdf.shape[0]
+    return gdf
+
+
+def fix_city(
+    db: dbTools.DBworker,
+    snapshot_cache: snapshots.SnapshotCache,
+    city: str,
+    distance_limit: float,
+    dry_run: bool,
+    from_file: bool,
+    save_data: bool,
+    download_lock: typing.ContextManager = contextlib.nullcontext(),
+    engine: str = "geopandas",
+    tile_size: typing.Optional[float] = None,
+    preloaded: typing.Optional[typing.Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame, typing.Optional[int]]] = None,
+    journal: typing.Optional[snapshots.ApplyJournal] = None,
+) -> dict:
+    if _resume_pending(journal, city, dry_run):
+        return resume_apply(db, journal, city)
+    summary = {"city": city, "building_points": 0, "no_neighbors": 0, "services_transferred": 0}
+    if preloaded is not None:
+        # здания, сервисы и СК уже скачаны, например AsyncDBworker.download_city;
+        # с tile_size в gdf_buildings достаточно точек, полигоны грузятся потайлово
+        gdf_buildings, gdf_services, local_crs = preloaded
+        engine = "geopandas"
     else:
-        logging.info(f"Reading {city}'s services file")
-        gdf_services = gpd.read_file(f"data/services_{city}.geojson")
-        logging.info(f"Done reading services!\n")
-
-        logging.info(f"Reading {city}'s building file")
-        gdf_buildings = gpd.read_file(f"data/buildings_{city}.geojson")
-        logging.info(f"Done reading buildings!\n")
-
-    # Выбрать строки, у которых геометрия типа Точка и полигон
-    gdf_geom_points = gdf_buildings[(gdf_buildings.geometry.type == "Point")].copy()
-    gdf_geom_polygons = gdf_buildings[
-        (gdf_buildings.geometry.type.isin(["Polygon", "MultiPolygon"]))
-    ].copy()
+        with download_lock:
+            if engine == "postgis":
+                # Точки-здания сопоставляются с полигонами прямо в БД, здания не скачиваются
+                with metrics.stage("postgis_search", tool=TOOL, city=city) as stage:
+                    gdf_geom_points = db.search_nearest_neighbor_in_db(city, distance_limit)
+                    stage["rows"] = gdf_geom_points.shape[0]
+            else:
+                with metrics.stage("download", tool=TOOL, city=city, table="buildings") as stage:
+                    if tile_size:
+                        # В памяти держим только точки, полигоны грузятся потайлово
+                        if from_file:
+                            gdf_buildings = snapshot_cache.read(city, "buildings", points_only=True)
+                        else:
+                            gdf_buildings = db.download_buildings(city, geometry_types=["ST_Point"])
+                    else:
+                        gdf_buildings = load_city_table(db, snapshot_cache, city, "buildings", from_file, save_data)
+                    local_crs = None if from_file else db.get_city_local_crs(city)
+                    stage["rows"] = gdf_buildings.shape[0]
+            with metrics.stage("download", tool=TOOL, city=city, table="services") as stage:
+                gdf_services = load_city_table(db, snapshot_cache, city, "services", from_file, save_data)
+                stage["rows"] = gdf_services.shape[0]
+
+    if engine != "postgis":
+        # Выбрать строки, у которых геометрия типа Точка и полигон
+        gdf_geom_points = gdf_buildings[(gdf_buildings.geometry.type == "Point")].copy()
+        gdf_geom_polygons = gdf_buildings[
+            (gdf_buildings.geometry.type.isin(["Polygon", "MultiPolygon"]))
+        ].copy()
+        del gdf_buildings
     if gdf_geom_points.shape[0] == 0:
         logging.info(f"No buildings-points in {city} city, exiting.")
-        exit()
+        return summary
     else:
         logging.info(
             f"There are {gdf_geom_points.shape[0]} buildings-point(s) in {city} city."
         )
-    gdf_geom_points = search_nearest_neighbor(
-        gdf_geom_points, gdf_geom_polygons, distance_limit
-    )  # добавлен столбец с ближайшим соседом не точкой
+    summary["building_points"] = gdf_geom_points.shape[0]
+    if engine != "postgis" and tile_size:
+        gdf_geom_points = search_nearest_neighbor_tiled(
+            gdf_geom_points,
+            lambda bbox: load_polygons_in_bbox(db, snapshot_cache, city, bbox, from_file),
+            distance_limit,
+            tile_size,
+            local_crs,
+            city,
+        )
+    elif engine != "postgis":
+        gdf_geom_points = search_nearest_neighbor(
+            gdf_geom_points, gdf_geom_polygons, distance_limit, local_crs, city
+        )  # добавлен столбец с ближайшим соседом не точкой
 
     # Проверяем на наличие точек-зданий без соседей
     if (
@@ -99,6 +551,7 @@ def main():
             f"There are {gdf_.shape[0]} building-point(s) in {city} city with no neighbor in distance = {distance_limit}, check "
             f"<no_neighbors_{city}.json> file"
         )
+        summary["no_neighbors"] = gdf_.shape[0]
     points_amount = gdf_geom_points.shape[0]
     # Находим точки, которые надо удалить из бд
     gdf_geom_points = gdf_geom_points.dropna(subset=["closest_building_physical_id"])
@@ -107,27 +560,11 @@ def main():
         logging.info(
             f"No buildings-points in {city} city to remove, services will not be transferred, exiting."
         )
-        exit()
-    # отделяем сервисы, привязанные к зданиям точкам
-    list_buildings_points = gdf_geom_points["physical_object_id"].tolist()
-    gdf_services = gdf_services.query("physical_object_id in @list_buildings_points")
-
-    for index, row in gdf_services.iterrows():
-        physical_object_id = row["physical_object_id"]
-        closest_building_physical_id = (
-            gdf_geom_points[
-                gdf_geom_points["physical_object_id"] == physical_object_id
-            ]["closest_building_physical_id"]
-            .explode()
-            .unique()
-        )
-
-        if len(closest_building_physical_id) > 0:
-            gdf_services.loc[
-                index, "physical_object_id"
-            ] = closest_building_physical_id[0]
-
-    gdf_services = gdf_services.astype({"physical_object_id": int})
+        return summary
+    # отделяем сервисы, привязанные к зданиям точкам, и переносим их на ближайшие здания
+    with metrics.stage("reassignment", tool=TOOL, city=city) as stage:
+        gdf_services = reassign_services(gdf_services, gdf_geom_points)
+        stage["rows"] = gdf_services.shape[0]
 
     points_amount_to_change = gdf_services.shape[0]
     if points_amount_to_change > 0:
@@ -135,12 +572,13 @@ def main():
             f'In the city of "{city}", neighbors were found at a distance of {distance_limit} for {points_amount_to_change} services out of {points_amount} building points.'
         )
         if not dry_run:
-            db.upload_services(gdf_services)
-            db.remove_building(gdf_geom_points)
+            apply_fixes(db, journal, city, gdf_services, gdf_geom_points)
+            summary["services_transferred"] = points_amount_to_change
         else:
             logging.info("The config specifies a dry run, data will not be saved.")
     else:
         logging.info(f"No services to transfer and no building-points to delete.")
+    return summary
 
 
 #
@@ -160,37 +598,3 @@ def main():
 if __name__ == "__main__":
     main()
 
-
-def search_neighbors_from_point(
-    points_data: gpd.GeoDataFrame, search_in_data: gpd.GeoDataFrame, n_neigh, radius
-) -> gpd.GeoDataFrame:
-    x = points_data.to_crs("EPSG:3857").geometry.centroid.apply(lambda point: point.x)
-    y = points_data.to_crs("EPSG:3857").geometry.centroid.apply(lambda point: point.y)
-    points = pd.DataFrame({"x": x, "y": y})
-    x2 = search_in_data.to_crs("EPSG:3857").geometry.centroid.apply(
-        lambda point: point.x
-    )
-    y2 = search_in_data.to_crs("EPSG:3857").geometry.centroid.apply(
-        lambda point: point.y
-    )
-    buildings_points = pd.DataFrame({"x": x2, "y": y2})
-    neigh = NearestNeighbors(n_neighbors=n_neigh, radius=radius)
-    neigh.fit(buildings_points)
-    neigh_dist, neigh_ind = neigh.kneighbors(points)
-    neigh_ind = pd.Series(neigh_ind.tolist())
-
-    # print((search_in_data.iloc[neigh_ind.explode()])["id"].explode().reset_index(drop=True))
-    index = points_data.index
-    points_data = points_data.reset_index(drop=True)
-    points_data["closest_building_id"] = (
-        (search_in_data.iloc[neigh_ind.explode()])["physical_object_id"]
-        .explode()
-        .reset_index(drop=True)
-    )
-    points_data = points_data.set_index(index)
-
-    # rows_to_keep = neigh_ind.explode().unique()
-    # search_in_data_filtered = search_in_data.iloc[rows_to_keep]
-
-    return points_data
-
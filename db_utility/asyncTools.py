@@ -0,0 +1,193 @@
+import asyncio
+import contextlib
+import logging
+import re
+import tempfile
+import time
+import typing
+from datetime import datetime
+
+import asyncpg
+import geopandas as gpd
+import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from db_utility import dbTools
+
+
+def _to_asyncpg_dsn(sql_connection: str) -> str:
+    # asyncpg не понимает SQLAlchemy-схемы вида postgresql+psycopg2://
+    url = sa.engine.make_url(sql_connection).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def _to_numeric_params(sql_: str, params: dict) -> typing.Tuple[str, list]:
+    # %(name)s -> $1, $2, ... в порядке первого появления
+    names: typing.List[str] = []
+
+    def replace(match):
+        if match.group(1) not in names:
+            names.append(match.group(1))
+        return f"${names.index(match.group(1)) + 1}"
+
+    return re.sub(r"%\((\w+)\)s", replace, sql_), [params[name] for name in names]
+
+
+class AsyncDBworker:
+    """asyncio counterpart of ``DBworker`` for downloads, independent queries run concurrently on an asyncpg pool.
+
+    Use it as ``async with AsyncDBworker(sql_connection) as adb: ...``.
+    """
+
+    def __init__(
+        self,
+        sql_connection: str,
+        pool_size: int = 5,
+        statement_timeout: typing.Optional[int] = None,
+        pgbouncer: bool = False,
+        reference_ttl: float = 3600,
+    ):
+        self.sql_connection = sql_connection
+        self.pool_size = pool_size
+        self.statement_timeout = statement_timeout
+        self.pgbouncer = pgbouncer
+        self.reference_ttl = reference_ttl
+        self.pool: typing.Optional[asyncpg.Pool] = None
+        self._reference_data: typing.Dict[str, typing.Tuple[float, pd.DataFrame]] = {}
+        self._reference_locks: typing.Dict[str, asyncio.Lock] = {}
+
+    async def connect(self):
+        if self.pool is not None:
+            return
+        logging.info(f"Initializing AsyncDBworker with SQL connection {self.sql_connection}")
+        server_settings = {}
+        if self.statement_timeout is not None and not self.pgbouncer:
+            server_settings["statement_timeout"] = str(int(self.statement_timeout))
+        self.pool = await asyncpg.create_pool(
+            _to_asyncpg_dsn(self.sql_connection),
+            min_size=1,
+            max_size=self.pool_size,
+            server_settings=server_settings,
+            # PgBouncer в режиме пула транзакций не поддерживает именованные подготовленные выражения
+            statement_cache_size=0 if self.pgbouncer else 100,
+        )
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def _transaction(self):
+        await self.connect()
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                if self.pgbouncer and self.statement_timeout is not None:
+                    await conn.execute(f"SET LOCAL statement_timeout = {int(self.statement_timeout)}")
+                yield conn
+
+    async def get_reference_table(self, name: str, refresh: bool = False) -> pd.DataFrame:
+        lock = self._reference_locks.setdefault(name, asyncio.Lock())
+        # одновременные запросы одной таблицы ждут одну загрузку
+        async with lock:
+            cached = self._reference_data.get(name)
+            if cached is not None and not refresh and time.monotonic() - cached[0] < self.reference_ttl:
+                return cached[1]
+            logging.info(f"Loading reference table {name}")
+            stmt = dbTools.reference_table_query(name)
+            async with self._transaction() as conn:
+                rows = await conn.fetch(str(stmt.compile(dialect=postgresql.dialect())))
+            df = pd.DataFrame([tuple(row) for row in rows], columns=list(stmt.selected_columns.keys()))
+            self._reference_data[name] = (time.monotonic(), df)
+            return df
+
+    async def _get_city(self, city_name: str) -> pd.Series:
+        cities = await self.get_reference_table("cities")
+        city = cities[cities["name"] == city_name]
+        if city.shape[0] == 0:
+            cities = await self.get_reference_table("cities", refresh=True)
+            city = cities[cities["name"] == city_name]
+        if city.shape[0] == 0:
+            raise sa.exc.NoResultFound(f"City {city_name} is not found")
+        return city.iloc[0]
+
+    async def get_city_local_crs(self, city_name: str) -> typing.Optional[int]:
+        local_crs = (await self._get_city(city_name))["local_crs"]
+        return None if pd.isna(local_crs) else int(local_crs)
+
+    async def get_city_names(self) -> typing.List[str]:
+        return sorted((await self.get_reference_table("cities"))["name"])
+
+    async def get_city_object_ids(self, table: str, city_name: str) -> typing.List[int]:
+        city_id = int((await self._get_city(city_name))["id"])
+        async with self._transaction() as conn:
+            rows = await conn.fetch(
+                f"SELECT b.id FROM {table} b JOIN physical_objects p ON b.physical_object_id = p.id "
+                "WHERE p.city_id = $1",
+                city_id,
+            )
+        return [row["id"] for row in rows]
+
+    async def _download_city_objects(
+        self,
+        table: str,
+        city_name: str,
+        columns: typing.Sequence[str],
+        updated_since: typing.Optional[datetime],
+        geometry_types: typing.Optional[typing.Sequence[str]] = None,
+        bbox: typing.Optional[typing.Tuple[float, float, float, float]] = None,
+    ) -> gpd.GeoDataFrame:
+        city_id = int((await self._get_city(city_name))["id"])
+        sql_, params = _to_numeric_params(
+            *dbTools.city_objects_query(table, city_id, columns, updated_since, geometry_types, bbox)
+        )
+        with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as buffer:
+            async with self._transaction() as conn:
+                await conn.copy_from_query(sql_, *params, output=buffer, format="csv", header=True)
+            buffer.seek(0)
+            # разбор CSV и WKB не должен блокировать цикл событий
+            return await asyncio.to_thread(dbTools.read_city_objects_csv, buffer)
+
+    async def download_services(
+        self,
+        city_name: str,
+        columns: typing.Sequence[str] = dbTools.SERVICE_COLUMNS,
+        updated_since: typing.Optional[datetime] = None,
+    ) -> gpd.GeoDataFrame:
+        logging.info(f"Downloading {city_name}'s services")
+        gdf = await self._download_city_objects("functional_objects", city_name, columns, updated_since)
+        logging.info(f"Done downloading {city_name}'s services!")
+        return gdf
+
+    async def download_buildings(
+        self,
+        city_name: str,
+        columns: typing.Sequence[str] = dbTools.BUILDING_COLUMNS,
+        updated_since: typing.Optional[datetime] = None,
+        geometry_types: typing.Optional[typing.Sequence[str]] = None,
+        bbox: typing.Optional[typing.Tuple[float, float, float, float]] = None,
+    ) -> gpd.GeoDataFrame:
+        logging.info(f"Downloading {city_name}'s building")
+        gdf = await self._download_city_objects(
+            "buildings", city_name, columns, updated_since, geometry_types=geometry_types, bbox=bbox
+        )
+        logging.info(f"Done downloading {city_name}'s building!")
+        return gdf
+
+    async def download_city(
+        self, city_name: str
+    ) -> typing.Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame, typing.Optional[int]]:
+        """Downloads buildings, services and the local CRS of a city concurrently."""
+        return await asyncio.gather(
+            self.download_buildings(city_name),
+            self.download_services(city_name),
+            self.get_city_local_crs(city_name),
+        )
@@ -1,94 +1,545 @@
+from __future__ import annotations
+
+import contextlib
+import io
 import logging
+import tempfile
+import threading
+import time
 import typing
 from datetime import datetime
-import geopandas as gpd
 import sqlalchemy as sa
 import pandas as pd
+from sqlalchemy.dialects import postgresql
+
+from db_utility import mapping, metrics
+
+if typing.TYPE_CHECKING:
+    import geopandas as gpd
+
+# geopandas и shapely импортируются в функциях, которые возвращают геометрию:
+# утилитам без геометрии (search_and_clear) они не нужны, а импорт занимает заметную часть запуска
+
+# Columns the tools actually use, geometry is always added by the loader
+BUILDING_COLUMNS = ("id", "physical_object_id")
+SERVICE_COLUMNS = ("id", "physical_object_id")
+
+# Таблицы без геометрических колонок для запросов search_and_clear: полные описания из mapping
+# загружают geoalchemy2 и shapely, которые этим запросам не нужны
+ALL_SERVICES = sa.table(
+    "all_services",
+    sa.column("service_name"),
+    sa.column("building_id"),
+    sa.column("city_service_type"),
+    sa.column("city_service_type_id"),
+    sa.column("functional_object_id"),
+    sa.column("city"),
+)
+FUNCTIONAL_OBJECTS = sa.table("functional_objects", sa.column("id"))
+
+# Справочные таблицы меняются редко, их можно держать в памяти и перечитывать раз в reference_ttl секунд
+REFERENCE_TABLES = ("cities", "city_service_types", "city_functions", "service_hierarchy")
+
+
+def reference_table_query(name: str) -> sa.Select:
+    if name == "cities":
+        # геометрия не загружается, она нужна только в save_city_to_file
+        table = mapping.City.__table__
+        return sa.select(
+            table.c.id,
+            table.c.name,
+            table.c.code,
+            table.c.local_crs,
+            table.c.population,
+            table.c.region_id,
+            table.c.city_division_type,
+        )
+    if name == "city_service_types":
+        return sa.select(mapping.CityServiceType.__table__)
+    if name == "city_functions":
+        return sa.select(mapping.CityFunction.__table__)
+    if name == "service_hierarchy":
+        return sa.select(mapping.t_service_hierarchy)
+    raise KeyError(f"{name} is not a reference table, expected one of {REFERENCE_TABLES}")
+
+
+def same_services_query(service_ids: typing.Sequence[int], city_name: typing.Optional[str] = None) -> sa.Select:
+    """Services of ``service_ids`` types that share a building with another service of the same type."""
+    table = ALL_SERVICES
+    services = (
+        sa.select(
+            table.c.service_name,
+            table.c.building_id,
+            table.c.city_service_type,
+            table.c.city_service_type_id,
+            table.c.functional_object_id,
+            sa.func.count()
+            .over(partition_by=[table.c.city_service_type_id, table.c.building_id])
+            .label("services_in_building"),
+        )
+        .where(
+            table.c.city_service_type_id
+            == sa.any_(sa.bindparam("service_ids", list(service_ids), type_=postgresql.ARRAY(sa.Integer)))
+        )
+        .where(table.c.building_id.isnot(None))
+    )
+    if city_name is not None:
+        services = services.where(table.c.city == city_name)
+    services = services.subquery()
+    return sa.select(
+        services.c.service_name,
+        services.c.building_id,
+        services.c.city_service_type,
+        services.c.city_service_type_id,
+        services.c.functional_object_id,
+    ).where(services.c.services_in_building > 1)
+
+
+def delete_services_query(ids: typing.Sequence[int]) -> sa.Delete:
+    return sa.delete(FUNCTIONAL_OBJECTS).where(
+        FUNCTIONAL_OBJECTS.c.id == sa.any_(sa.bindparam("ids", list(ids), type_=postgresql.ARRAY(sa.Integer)))
+    )
+
+
+_engines: typing.Dict[tuple, sa.Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(
+    sql_connection: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_pre_ping: bool = True,
+    statement_timeout: typing.Optional[int] = None,
+    pgbouncer: bool = False,
+) -> sa.Engine:
+    """Returns an engine shared by every caller in the process with the same DSN and pool settings.
+
+    ``statement_timeout`` is in milliseconds. With ``pgbouncer`` the pooling is left to PgBouncer and the timeout
+    is set per transaction, since startup options are not passed through in transaction pooling mode.
+    """
+    key = (sql_connection, pool_size, max_overflow, pool_pre_ping, statement_timeout, pgbouncer)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            return engine
+        if pgbouncer:
+            engine = sa.create_engine(sql_connection, poolclass=sa.pool.NullPool)
+            if statement_timeout is not None:
+
+                @sa.event.listens_for(engine, "begin")
+                def set_statement_timeout(conn):
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout)}")
+
+        else:
+            connect_args = {}
+            if statement_timeout is not None:
+                connect_args["options"] = f"-c statement_timeout={int(statement_timeout)}"
+            engine = sa.create_engine(
+                sql_connection,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=pool_pre_ping,
+                connect_args=connect_args,
+            )
+        metrics.instrument_engine(engine)
+        _engines[key] = engine
+        return engine
+
+
+def city_objects_query(
+    table: str,
+    city_id: int,
+    columns: typing.Sequence[str],
+    updated_since: typing.Optional[datetime] = None,
+    geometry_types: typing.Optional[typing.Sequence[str]] = None,
+    bbox: typing.Optional[typing.Tuple[float, float, float, float]] = None,
+    physical_object_ids: typing.Optional[typing.Iterable[int]] = None,
+) -> typing.Tuple[str, dict]:
+    """Builds the download query of a city's buildings or services with pyformat parameters.
 
-from db_utility import mapping
+    Geometry is returned as hex WKB in the ``geometry`` column, it is decoded by ``read_city_objects_csv``.
+    """
+    columns_sql = ", ".join(f"b.{column}" for column in columns)
+    # buildings has no updated_at of its own, changes are tracked on physical_objects
+    updated_at = "p.updated_at" if table == "buildings" else "GREATEST(p.updated_at, b.updated_at)"
+    sql_ = (
+        f"SELECT {columns_sql}, {updated_at} AS updated_at, "
+        "encode(ST_AsBinary(p.geometry), 'hex') AS geometry "
+        f"FROM {table} b JOIN physical_objects p ON b.physical_object_id = p.id "
+        "WHERE p.city_id = %(city_id)s"
+    )
+    params = {"city_id": city_id}
+    if updated_since is not None:
+        sql_ += f" AND {updated_at} >= %(updated_since)s"
+        params["updated_since"] = updated_since
+    if geometry_types is not None:
+        sql_ += " AND ST_GeometryType(p.geometry) = ANY(%(geometry_types)s)"
+        params["geometry_types"] = list(geometry_types)
+    if bbox is not None:
+        sql_ += " AND p.geometry && ST_MakeEnvelope(%(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 4326)"
+        params.update(zip(("xmin", "ymin", "xmax", "ymax"), map(float, bbox)))
+    if physical_object_ids is not None:
+        sql_ += " AND b.physical_object_id = ANY(%(physical_object_ids)s)"
+        params["physical_object_ids"] = [int(obj_id) for obj_id in physical_object_ids]
+    return sql_, params
+
+
+def read_city_objects_csv(buffer: typing.IO) -> gpd.GeoDataFrame:
+    import geopandas as gpd
+    import shapely
+
+    df = pd.read_csv(buffer)
+    if "updated_at" in df.columns:
+        df["updated_at"] = pd.to_datetime(df["updated_at"], utc=True, format="ISO8601")
+    geometry = shapely.from_wkb(df.pop("geometry").to_numpy(dtype=object))
+    return gpd.GeoDataFrame(df, geometry=geometry, crs=4326)
 
 
 class DBworker:
     def __init__(
         self,
         sql_connection: str,
+        batch_size: int = 10000,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        refresh_policy: str = "immediate",
+        statement_timeout: typing.Optional[int] = None,
+        pgbouncer: bool = False,
+        reference_ttl: float = 3600,
     ):
         logging.info(f"Initializing DBworker with SQL connection {sql_connection}")
-        self.engine = sa.create_engine(sql_connection)
+        self.engine = get_engine(
+            sql_connection,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            statement_timeout=statement_timeout,
+            pgbouncer=pgbouncer,
+        )
+        self.batch_size = batch_size
+        # immediate - обновлять представление сразу, deferred - копить и обновлять один раз в flush_refreshes
+        self.refresh_policy = refresh_policy
+        self._pending_refreshes: typing.List[str] = []
+        self.reference_ttl = reference_ttl
+        self._reference_data: typing.Dict[str, typing.Tuple[float, pd.DataFrame]] = {}
+
+    def get_reference_table(self, name: str, refresh: bool = False) -> pd.DataFrame:
+        """Returns a reference table from the in-memory cache, it is reloaded when older than ``reference_ttl``."""
+        cached = self._reference_data.get(name)
+        if cached is not None and not refresh and time.monotonic() - cached[0] < self.reference_ttl:
+            return cached[1]
+        logging.info(f"Loading reference table {name}")
+        with self.engine.connect() as conn:
+            df = pd.read_sql(reference_table_query(name), conn)
+        self._reference_data[name] = (time.monotonic(), df)
+        return df
+
+    def invalidate_reference_data(self, name: typing.Optional[str] = None):
+        if name is None:
+            self._reference_data.clear()
+        else:
+            self._reference_data.pop(name, None)
+
+    def _get_city(self, city_name: str) -> pd.Series:
+        cities = self.get_reference_table("cities")
+        city = cities[cities["name"] == city_name]
+        if city.shape[0] == 0:
+            # город мог появиться после загрузки справочника
+            cities = self.get_reference_table("cities", refresh=True)
+            city = cities[cities["name"] == city_name]
+        if city.shape[0] == 0:
+            raise sa.exc.NoResultFound(f"City {city_name} is not found")
+        return city.iloc[0]
+
+    @staticmethod
+    def _begin_raw_transaction(connection):
+        # COPY идёт через курсор psycopg2 мимо SQLAlchemy, поэтому транзакцию начинаем явно:
+        # только так срабатывает событие begin, которое с pgbouncer ставит SET LOCAL statement_timeout
+        if not connection.in_transaction():
+            connection.begin()
+
+    def copy_statement_timeout(self) -> int:
+        """Returns the statement timeout in milliseconds seen by a COPY transaction, 0 means no timeout."""
+        with self.engine.connect() as conn:
+            self._begin_raw_transaction(conn)
+            with conn.connection.cursor() as cursor:
+                cursor.execute("SELECT setting FROM pg_settings WHERE name = 'statement_timeout'")
+                return int(cursor.fetchone()[0])
+
+    @staticmethod
+    def _copy_to_temp_table(
+        connection, name: str, columns: typing.Dict[str, str], data: pd.DataFrame, create: bool
+    ):
+        DBworker._begin_raw_transaction(connection)
+        if create:
+            columns_ddl = ", ".join(f"{column} {column_type}" for column, column_type in columns.items())
+            connection.execute(sa.text(f"CREATE TEMP TABLE {name} ({columns_ddl}) ON COMMIT DROP"))
+        else:
+            connection.execute(sa.text(f"TRUNCATE {name}"))
+        buffer = io.StringIO()
+        data[list(columns)].to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        metrics.count_round_trip()
 
 
     def refresh_materialized_view(self, name: str):
-        logging.info(f"Refreshing materialized view {name}")
-        with self.engine.begin() as conn:
-            conn.execute(sa.text(f"REFRESH MATERIALIZED VIEW {name}"))
+        if self.refresh_policy == "deferred":
+            if name not in self._pending_refreshes:
+                self._pending_refreshes.append(name)
+            logging.info(f"Refreshing materialized view {name} is deferred")
+            return
+        with metrics.stage("view_refresh", view=name), self.engine.begin() as conn:
+            # CONCURRENTLY не блокирует читателей, но требует уникального индекса по колонкам
+            has_unique_index = conn.execute(
+                sa.text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid "
+                    "WHERE c.relname = :name AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL)"
+                ).params(name=name)
+            ).scalar()
+            concurrently = "CONCURRENTLY " if has_unique_index else ""
+            logging.info(f"Refreshing materialized view {concurrently}{name}")
+            conn.execute(sa.text(f"REFRESH MATERIALIZED VIEW {concurrently}{name}"))
         logging.info("Done refreshing!")
 
+    def flush_refreshes(self):
+        pending, self._pending_refreshes = self._pending_refreshes, []
+        policy, self.refresh_policy = self.refresh_policy, "immediate"
+        try:
+            for name in pending:
+                self.refresh_materialized_view(name)
+        finally:
+            self.refresh_policy = policy
+
+    @contextlib.contextmanager
+    def deferred_refreshes(self):
+        policy, self.refresh_policy = self.refresh_policy, "deferred"
+        try:
+            yield self
+        finally:
+            self.refresh_policy = policy
+            if policy != "deferred":
+                self.flush_refreshes()
+
     def get_buildings_with_same_service(self, service_id: int):
+        return self.get_buildings_with_same_services([service_id])
+
+    def get_buildings_with_same_services(
+        self, service_ids: typing.Iterable[int], city_name: typing.Optional[str] = None
+    ):
+        service_ids = list(service_ids)
         logging.info(
-            f"Fetching buildings with multiple occurrences of the same service type for service_id: {service_id}"
+            f"Fetching buildings with multiple occurrences of the same service type for service_ids: {service_ids}"
         )
         with self.engine.connect() as conn:
-            table = mapping.t_all_services
-            stmt = sa.select(
-                table.c.service_name, table.c.building_id, table.c.city_service_type, table.c.functional_object_id
-            ).where(
-                table.c.building_id.in_(
-                    sa.select(table.c.building_id.distinct())
-                    .where(table.c.city_service_type_id == service_id)
-                    .group_by(table.c.building_id)
-                    .having(sa.func.count("*") > 1)
-                )
-                & (table.c.city_service_type_id == service_id)
-            )
+            stmt = same_services_query(service_ids, city_name)
             df = pd.read_sql(stmt, conn)
             logging.info("Done fetching!")
         return df
 
-    def remove_services(self, fuctional_object_ids: typing.Iterable[int]):
+    def remove_services(self, fuctional_object_ids: typing.Iterable[int], batch_size: typing.Optional[int] = None):
         logging.info(f"Removing the found services.")
-        with self.engine.connect() as conn:
-            for obj_id in fuctional_object_ids:
-                stmt = sa.delete(mapping.FunctionalObject).where(
-                    mapping.FunctionalObject.id == obj_id
-                )
-                conn.execute(stmt)
-            conn.commit()
+        ids = [int(obj_id) for obj_id in fuctional_object_ids]
+        batch_size = batch_size or self.batch_size
+        with self.engine.begin() as conn:
+            for start in range(0, len(ids), batch_size):
+                conn.execute(delete_services_query(ids[start : start + batch_size]))
         logging.info("Done removing!")
         self.refresh_materialized_view("all_services")
         return
 
-    def download_services(self, city_name: str, save: bool):
-        logging.info(f"Downloading {city_name}'s services")
+    @staticmethod
+    def _copy_to_geodataframe(connection, sql_: str, params: dict) -> gpd.GeoDataFrame:
+        # COPY streams the result in one pass, WKB is sent as hex and decoded by shapely at once
+        DBworker._begin_raw_transaction(connection)
+        with connection.connection.cursor() as cursor:
+            # psycopg2 подставляет параметры на клиенте, так что сервер получает текст с литералами каждого города
+            # и планы между городами не переиспользуются, параметры здесь только для безопасного экранирования
+            query = cursor.mogrify(sql_, params).decode()
+            with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as buffer:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+                metrics.count_round_trip()
+                buffer.seek(0)
+                return read_city_objects_csv(buffer)
+
+    def _get_city_id(self, city_name: str) -> int:
+        return int(self._get_city(city_name)["id"])
+
+    def _download_city_objects(
+        self,
+        table: str,
+        city_name: str,
+        columns: typing.Optional[typing.Sequence[str]],
+        updated_since: typing.Optional[datetime],
+        geometry_types: typing.Optional[typing.Sequence[str]] = None,
+        bbox: typing.Optional[typing.Tuple[float, float, float, float]] = None,
+        physical_object_ids: typing.Optional[typing.Iterable[int]] = None,
+    ) -> gpd.GeoDataFrame:
+        city_id = self._get_city_id(city_name)
         with self.engine.connect() as conn:
-            city_id: int = conn.execute(
-                sa.text("SELECT id FROM cities WHERE name =:name").params(
-                    name=city_name
+            if columns is None:
+                import geopandas as gpd
+
+                sql_ = sa.text(
+                    f"SELECT p.geometry, b.* FROM {table} b JOIN physical_objects p ON b.physical_object_id = p.id "
+                    "WHERE p.city_id = :city_id"
                 )
-            ).scalar_one()
-            sql_ = f"SELECT p.geometry, b.* FROM functional_objects b JOIN physical_objects p ON b.physical_object_id = p.id WHERE p.city_id = {city_id}"
-            gdf = gpd.read_postgis(sql_, conn, geom_col="geometry")
-            if save:
-                gdf.to_file(f"data/services_{city_name}.geojson")
+                return gpd.read_postgis(sql_, conn, geom_col="geometry", params={"city_id": city_id})
+            sql_, params = city_objects_query(
+                table, city_id, columns, updated_since, geometry_types, bbox, physical_object_ids
+            )
+            return self._copy_to_geodataframe(conn, sql_, params)
+
+    def download_services(
+        self,
+        city_name: str,
+        columns: typing.Optional[typing.Sequence[str]] = SERVICE_COLUMNS,
+        updated_since: typing.Optional[datetime] = None,
+        physical_object_ids: typing.Optional[typing.Iterable[int]] = None,
+    ):
+        logging.info(f"Downloading {city_name}'s services")
+        gdf = self._download_city_objects(
+            "functional_objects", city_name, columns, updated_since, physical_object_ids=physical_object_ids
+        )
         logging.info("Done downloading services!\n")
         return gdf
 
-    def download_buildings(self, city_name: str, save: bool):
+    def download_buildings(
+        self,
+        city_name: str,
+        columns: typing.Optional[typing.Sequence[str]] = BUILDING_COLUMNS,
+        updated_since: typing.Optional[datetime] = None,
+        geometry_types: typing.Optional[typing.Sequence[str]] = None,
+        bbox: typing.Optional[typing.Tuple[float, float, float, float]] = None,
+    ):
         logging.info(f"Downloading {city_name}'s building")
-        with self.engine.connect() as conn:
-            city_id: int = conn.execute(
-                sa.text("SELECT id FROM cities WHERE name =:name").params(
-                    name=city_name
-                )
-            ).scalar_one()
-            sql_ = f"SELECT p.geometry, b.* FROM buildings b JOIN physical_objects p ON b.physical_object_id = p.id WHERE p.city_id = {city_id}"
-            gdf = gpd.read_postgis(sql_, conn, geom_col="geometry")
-            if save:
-                gdf.to_file(f"data/buildings_{city_name}.geojson")
+        gdf = self._download_city_objects(
+            "buildings", city_name, columns, updated_since, geometry_types=geometry_types, bbox=bbox
+        )
         logging.info("Done downloading building!\n")
         return gdf
 
-    def remove_building(self, data: gpd.GeoDataFrame):
+    def download_points_to_recheck(
+        self,
+        city_name: str,
+        updated_since: datetime,
+        distance_limit: float,
+        columns: typing.Sequence[str] = BUILDING_COLUMNS,
+    ) -> gpd.GeoDataFrame:
+        """Downloads building-points whose match may have changed since ``updated_since``.
+
+        These are points changed themselves or carrying changed services, and points within ``distance_limit``
+        of changed polygons.
+        """
+        logging.info(f"Downloading {city_name}'s building-points changed since {updated_since}")
+        columns_sql = ", ".join(f"b.{column}" for column in columns)
+        sql_ = f"""
+            WITH city AS (
+                SELECT id, COALESCE(
+                    local_crs,
+                    CASE WHEN ST_Y(center) >= 0 THEN 32600 ELSE 32700 END + floor((ST_X(center) + 180) / 6)::int + 1
+                ) AS crs
+                FROM cities WHERE id = %(city_id)s
+            ),
+            changed_polygons AS (
+                SELECT ST_Transform(p.geometry, city.crs) AS geometry
+                FROM city
+                JOIN physical_objects p ON p.city_id = city.id
+                JOIN buildings b ON b.physical_object_id = p.id
+                WHERE p.updated_at >= %(updated_since)s
+                    AND ST_GeometryType(p.geometry) IN ('ST_Polygon', 'ST_MultiPolygon')
+            )
+            SELECT {columns_sql}, p.updated_at AS updated_at, encode(ST_AsBinary(p.geometry), 'hex') AS geometry
+            FROM city
+            JOIN physical_objects p ON p.city_id = city.id
+            JOIN buildings b ON b.physical_object_id = p.id
+            WHERE ST_GeometryType(p.geometry) = 'ST_Point'
+                AND (
+                    p.updated_at >= %(updated_since)s
+                    OR EXISTS (
+                        SELECT 1 FROM functional_objects f
+                        WHERE f.physical_object_id = p.id AND f.updated_at >= %(updated_since)s
+                    )
+                    OR EXISTS (
+                        SELECT 1 FROM changed_polygons c
+                        WHERE ST_DWithin(c.geometry, ST_Transform(p.geometry, city.crs), %(distance_limit)s)
+                    )
+                )
+            """
+        params = {
+            "city_id": self._get_city_id(city_name),
+            "updated_since": updated_since,
+            "distance_limit": float(distance_limit),
+        }
+        with self.engine.connect() as conn:
+            gdf = self._copy_to_geodataframe(conn, sql_, params)
+        logging.info(f"Done downloading {gdf.shape[0]} building-point(s)!\n")
+        return gdf
+
+    def get_server_time(self) -> datetime:
+        with self.engine.connect() as conn:
+            return conn.execute(sa.text("SELECT now()")).scalar_one()
+
+    def search_nearest_neighbor_in_db(self, city_name: str, distance_limit: float) -> pd.DataFrame:
+        logging.info(f"Searching for {city_name}'s building-point's neighbors in DB")
+        # Расстояния считаются в локальной СК города (или в зоне UTM по центру города), как и в geopandas;
+        # && по расширенному охвату точки даёт индексный отбор кандидатов, <-> выбирает ближайший
+        sql_ = sa.text(
+            """
+            WITH city AS (
+                SELECT id, COALESCE(
+                    local_crs,
+                    CASE WHEN ST_Y(center) >= 0 THEN 32600 ELSE 32700 END + floor((ST_X(center) + 180) / 6)::int + 1
+                ) AS crs
+                FROM cities WHERE name = :name
+            )
+            SELECT b.id, b.physical_object_id, nearest.physical_object_id AS closest_building_physical_id
+            FROM city
+            JOIN physical_objects p ON p.city_id = city.id
+            JOIN buildings b ON b.physical_object_id = p.id
+            LEFT JOIN LATERAL (
+                SELECT b2.physical_object_id
+                FROM physical_objects p2
+                JOIN buildings b2 ON b2.physical_object_id = p2.id
+                WHERE p2.city_id = city.id
+                    AND ST_GeometryType(p2.geometry) IN ('ST_Polygon', 'ST_MultiPolygon')
+                    AND p2.geometry && ST_Transform(ST_Expand(ST_Transform(p.geometry, city.crs), :distance_limit + 1), 4326)
+                    AND ST_DWithin(ST_Transform(p2.geometry, city.crs), ST_Transform(p.geometry, city.crs), :distance_limit)
+                ORDER BY ST_Transform(p2.geometry, city.crs) <-> ST_Transform(p.geometry, city.crs), p2.id
+                LIMIT 1
+            ) nearest ON true
+            WHERE ST_GeometryType(p.geometry) = 'ST_Point'
+            """
+        ).params(name=city_name, distance_limit=distance_limit)
+        with self.engine.connect() as conn:
+            df = pd.read_sql(sql_, conn)
+        logging.info("Done searching neighbors!\n")
+        return df
+
+    def get_city_local_crs(self, city_name: str) -> typing.Optional[int]:
+        local_crs = self._get_city(city_name)["local_crs"]
+        return None if pd.isna(local_crs) else int(local_crs)
+
+    def get_city_names(self) -> typing.List[str]:
+        return sorted(self.get_reference_table("cities")["name"])
+
+    def get_city_object_ids(self, table: str, city_name: str) -> typing.List[int]:
+        city_id = self._get_city_id(city_name)
+        with self.engine.connect() as conn:
+            return conn.execute(
+                sa.text(
+                    f"SELECT b.id FROM {table} b JOIN physical_objects p ON b.physical_object_id = p.id "
+                    "WHERE p.city_id = :city_id"
+                ).params(city_id=city_id)
+            ).scalars().all()
+
+    def remove_building(self, data: gpd.GeoDataFrame, bulk: bool = True, batch_size: typing.Optional[int] = None):
         logging.info(f"Removing redundant building-points in DB")
+        if bulk:
+            self._remove_building_bulk(data, batch_size or self.batch_size)
+            logging.info("Done removing!\n")
+            return
         with self.engine.connect() as connection:
             for _, row in data.iterrows():
                 building_id = row["id"]
@@ -105,8 +556,31 @@ class DBworker:
             connection.commit()
         logging.info("Done removing!\n")
 
-    def upload_services(self, data: gpd.GeoDataFrame):
+    def _remove_building_bulk(self, data: pd.DataFrame, batch_size: int):
+        data = data.astype({"id": int, "physical_object_id": int})
+        with self.engine.begin() as connection:
+            for start in range(0, data.shape[0], batch_size):
+                self._delete_buildings(connection, data.iloc[start : start + batch_size], create=start == 0)
+
+    def _delete_buildings(self, connection, data: pd.DataFrame, create: bool):
+        self._copy_to_temp_table(
+            connection,
+            "tmp_buildings_to_remove",
+            {"id": "integer", "physical_object_id": "integer"},
+            data,
+            create=create,
+        )
+        connection.execute(sa.text("DELETE FROM buildings b USING tmp_buildings_to_remove t WHERE b.id = t.id"))
+        connection.execute(
+            sa.text("DELETE FROM physical_objects p USING tmp_buildings_to_remove t WHERE p.id = t.physical_object_id")
+        )
+
+    def upload_services(self, data: gpd.GeoDataFrame, bulk: bool = True, batch_size: typing.Optional[int] = None):
         logging.info(f"Updating services in DB")
+        if bulk:
+            self._upload_services_bulk(data, batch_size or self.batch_size)
+            logging.info("Done updating!\n")
+            return
         with self.engine.connect() as connection:
             for ind, row in data.iterrows():
                 id_value = row["id"]
@@ -117,20 +591,74 @@ class DBworker:
                     .where(mapping.FunctionalObject.id == id_value)
                     .values(
                         physical_object_id=new_physical_object_id,
-                        updated_at=datetime.now(),
+                        updated_at=sa.func.now(),
                     )
                 )
                 connection.execute(stmt)
             connection.commit()
         logging.info("Done updating!\n")
 
+    def _upload_services_bulk(self, data: pd.DataFrame, batch_size: int):
+        data = data.astype({"id": int, "physical_object_id": int})
+        with self.engine.begin() as connection:
+            for start in range(0, data.shape[0], batch_size):
+                self._update_services(connection, data.iloc[start : start + batch_size], create=start == 0)
+
+    def _update_services(self, connection, data: pd.DataFrame, create: bool):
+        self._copy_to_temp_table(
+            connection,
+            "tmp_services_to_update",
+            {"id": "integer", "physical_object_id": "integer"},
+            data,
+            create=create,
+        )
+        connection.execute(
+            sa.text(
+                "UPDATE functional_objects f SET physical_object_id = t.physical_object_id, "
+                "updated_at = now() FROM tmp_services_to_update t WHERE f.id = t.id"
+            )
+        )
+
+    def apply_building_fixes(
+        self,
+        services: pd.DataFrame,
+        points: pd.DataFrame,
+        batch_size: typing.Optional[int] = None,
+        completed_chunks: int = 0,
+        on_chunk_committed: typing.Optional[typing.Callable[[int], None]] = None,
+    ):
+        """Moves services off building-points and removes the points, ``batch_size`` points per transaction.
+
+        ``services`` keep the point they are moved from in ``from_physical_object_id``, so every chunk moves the
+        services of its own points before deleting them, and an interrupted apply never leaves services on removed
+        points. The first ``completed_chunks`` chunks are skipped, ``on_chunk_committed`` gets the number of
+        committed chunks after each of them. Re-applying a committed chunk changes nothing.
+        """
+        batch_size = batch_size or self.batch_size
+        points = points.astype({"id": int, "physical_object_id": int}).sort_values("physical_object_id")
+        services = services.astype({"id": int, "physical_object_id": int, "from_physical_object_id": int})
+        chunks = range(0, points.shape[0], batch_size)
+        logging.info(
+            f"Applying building fixes in {len(chunks)} chunk(s), {min(completed_chunks, len(chunks))} already done"
+        )
+        for chunk, start in enumerate(chunks):
+            if chunk < completed_chunks:
+                continue
+            chunk_points = points.iloc[start : start + batch_size]
+            chunk_services = services[services["from_physical_object_id"].isin(chunk_points["physical_object_id"])]
+            with self.engine.begin() as connection:
+                if chunk_services.shape[0] > 0:
+                    self._update_services(connection, chunk_services, create=True)
+                self._delete_buildings(connection, chunk_points, create=True)
+            if on_chunk_committed is not None:
+                on_chunk_committed(chunk + 1)
+        logging.info("Done applying!\n")
+
     def save_city_to_file(self, city_name: str):
+        import geopandas as gpd
+
+        city_id = self._get_city_id(city_name)
         with self.engine.connect() as conn:
-            city_id: int = conn.execute(
-                sa.text("SELECT id FROM cities WHERE name =:name").params(
-                    name=city_name
-                )
-            ).scalar_one()
-            sql_ = f"SELECT geometry FROM cities WHERE id = {city_id}"
-            gdf = gpd.read_postgis(sql_, conn, geom_col="geometry")
+            sql_ = sa.text("SELECT geometry FROM cities WHERE id = :city_id")
+            gdf = gpd.read_postgis(sql_, conn, geom_col="geometry", params={"city_id": city_id})
             gdf.to_file(f"{city_name}.geojson")
@@ -0,0 +1,59 @@
+# coding: utf-8
+"""Database tables and views.
+
+Submodules are imported on first access to their names, so a tool pays only for the tables it touches:
+``views`` need only SQLAlchemy, ``spatial_views`` and ``models`` also load geoalchemy2, and the ORM classes of
+``models`` bring in ``reference`` for their relationships.
+"""
+import importlib
+
+_SUBMODULES = {
+    "base": ["Base", "metadata"],
+    "views": [
+        "t_administrative_division",
+        "t_cities_statistics",
+        "t_geography_columns",
+        "t_geometry_columns",
+        "t_service_hierarchy",
+        "t_table_sizes",
+    ],
+    "spatial_views": ["t_all_buildings", "t_all_houses", "t_all_services", "t_houses"],
+    "reference": [
+        "AdministrativeUnitType",
+        "CityInfrastructureType",
+        "LivingSituation",
+        "MunicipalityType",
+        "SocialGroup",
+        "SpatialRefSy",
+        "CityFunction",
+        "CityServiceType",
+    ],
+    "models": [
+        "Region",
+        "City",
+        "AdministrativeUnit",
+        "Municipality",
+        "AgeSexSocialStatAdministrativeUnit",
+        "AgeSexStatMunicipality",
+        "Block",
+        "PhysicalObject",
+        "Building",
+        "FunctionalObject",
+    ],
+}
+_ATTRIBUTES = {name: submodule for submodule, names in _SUBMODULES.items() for name in names}
+
+__all__ = list(_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    submodule = _ATTRIBUTES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{submodule}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,199 @@
+# coding: utf-8
+"""Tables with geometry and the objects placed on them."""
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, SmallInteger, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from geoalchemy2.types import Geometry
+from sqlalchemy.orm import relationship
+
+from db_utility.mapping import reference  # noqa: F401, relationships to reference tables
+from db_utility.mapping.base import Base
+
+
+class Region(Base):
+    __tablename__ = 'regions'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('regions_id_seq'::regclass)"))
+    name = Column(String(50), nullable=False, unique=True)
+    code = Column(String(50), nullable=False, unique=True)
+    geometry = Column(Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    center = Column(Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+
+
+class City(Base):
+    __tablename__ = 'cities'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('cities_id_seq'::regclass)"))
+    name = Column(String(50), nullable=False, unique=True)
+    geometry = Column(Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    center = Column(Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    population = Column(Integer)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    city_division_type = Column(Enum('ADMIN_UNIT_PARENT', 'MUNICIPALITY_PARENT', 'NO_PARENT', name='city_division_type'), nullable=False)
+    local_crs = Column(Integer)
+    code = Column(String(50))
+    region_id = Column(ForeignKey('regions.id'))
+
+    region = relationship('Region')
+
+
+class AdministrativeUnit(Base):
+    __tablename__ = 'administrative_units'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('administrative_units_id_seq'::regclass)"))
+    parent_id = Column(ForeignKey('administrative_units.id'))
+    city_id = Column(ForeignKey('cities.id'), nullable=False, index=True)
+    type_id = Column(ForeignKey('administrative_unit_types.id'), nullable=False)
+    name = Column(String(50), nullable=False)
+    geometry = Column(Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    center = Column(Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    population = Column(Integer)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    municipality_parent_id = Column(Integer)
+
+    city = relationship('City')
+    parent = relationship('AdministrativeUnit', remote_side=[id])
+    type = relationship('AdministrativeUnitType')
+
+
+class Municipality(Base):
+    __tablename__ = 'municipalities'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('municipalities_id_seq'::regclass)"))
+    parent_id = Column(ForeignKey('municipalities.id'))
+    city_id = Column(ForeignKey('cities.id'), nullable=False, index=True)
+    type_id = Column(ForeignKey('municipality_types.id'), nullable=False)
+    name = Column(String(50), nullable=False)
+    geometry = Column(Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    center = Column(Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    population = Column(Integer)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    admin_unit_parent_id = Column(Integer)
+
+    city = relationship('City')
+    parent = relationship('Municipality', remote_side=[id])
+    type = relationship('MunicipalityType')
+
+
+class AgeSexSocialStatAdministrativeUnit(Base):
+    __tablename__ = 'age_sex_social_stat_administrative_units'
+
+    year = Column(SmallInteger, primary_key=True, nullable=False)
+    administrative_unit_id = Column(ForeignKey('administrative_units.id'), primary_key=True, nullable=False)
+    social_group_id = Column(ForeignKey('social_groups.id'), primary_key=True, nullable=False)
+    age = Column(SmallInteger, primary_key=True, nullable=False)
+    men = Column(Integer)
+    women = Column(Integer)
+
+    administrative_unit = relationship('AdministrativeUnit')
+    social_group = relationship('SocialGroup')
+
+
+class AgeSexStatMunicipality(Base):
+    __tablename__ = 'age_sex_stat_municipalities'
+
+    year = Column(SmallInteger, primary_key=True, nullable=False)
+    municipality_id = Column(ForeignKey('municipalities.id'), primary_key=True, nullable=False)
+    age = Column(SmallInteger, primary_key=True, nullable=False)
+    men = Column(Integer)
+    women = Column(Integer)
+
+    municipality = relationship('Municipality')
+
+
+class Block(Base):
+    __tablename__ = 'blocks'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('blocks_id_seq'::regclass)"))
+    city_id = Column(ForeignKey('cities.id'), index=True)
+    geometry = Column(Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    center = Column(Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    population = Column(Integer)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    municipality_id = Column(ForeignKey('municipalities.id'))
+    administrative_unit_id = Column(ForeignKey('administrative_units.id'))
+    area = Column(Float(53))
+
+    administrative_unit = relationship('AdministrativeUnit')
+    city = relationship('City')
+    municipality = relationship('Municipality')
+
+
+class PhysicalObject(Base):
+    __tablename__ = 'physical_objects'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('physical_objects_id_seq'::regclass)"))
+    osm_id = Column(String(50))
+    geometry = Column(Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    center = Column(Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False)
+    city_id = Column(ForeignKey('cities.id'), nullable=False, index=True)
+    municipality_id = Column(ForeignKey('municipalities.id'), index=True)
+    administrative_unit_id = Column(ForeignKey('administrative_units.id'), index=True)
+    block_id = Column(ForeignKey('blocks.id'), index=True)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+
+    administrative_unit = relationship('AdministrativeUnit')
+    block = relationship('Block')
+    city = relationship('City')
+    municipality = relationship('Municipality')
+
+
+class Building(Base):
+    __tablename__ = 'buildings'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('buildings_id_seq'::regclass)"))
+    physical_object_id = Column(ForeignKey('physical_objects.id'), unique=True)
+    address = Column(String(200))
+    project_type = Column(String(100))
+    building_area = Column(Float)
+    living_area = Column(Float)
+    storeys_count = Column(SmallInteger)
+    resident_number = Column(SmallInteger)
+    central_heating = Column(Boolean)
+    central_hotwater = Column(Boolean)
+    central_electro = Column(Boolean)
+    central_gas = Column(Boolean)
+    refusechute = Column(Boolean)
+    ukname = Column(String(100))
+    failure = Column(Boolean)
+    lift_count = Column(SmallInteger)
+    repair_years = Column(String(100))
+    is_living = Column(Boolean)
+    population_balanced = Column(SmallInteger, server_default=text("0"))
+    central_water = Column(Boolean)
+    modeled = Column(JSONB(astext_type=Text()), nullable=False, server_default=text("'{}'::jsonb"))
+    building_year = Column(SmallInteger)
+    properties = Column(JSONB(astext_type=Text()), nullable=False, server_default=text("'{}'::jsonb"))
+
+    physical_object = relationship('PhysicalObject', uselist=False)
+
+
+class FunctionalObject(Base):
+    __tablename__ = 'functional_objects'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('functional_objects_id_seq'::regclass)"))
+    name = Column(String(200))
+    opening_hours = Column(String(200))
+    website = Column(String(200))
+    phone = Column(String(100))
+    capacity = Column(Integer, nullable=False)
+    city_infrastructure_type_id = Column(ForeignKey('city_infrastructure_types.id'), nullable=False)
+    city_function_id = Column(ForeignKey('city_functions.id'), nullable=False)
+    city_service_type_id = Column(ForeignKey('city_service_types.id'), nullable=False, index=True)
+    created_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(True), nullable=False, server_default=text("now()"))
+    physical_object_id = Column(ForeignKey('physical_objects.id'), index=True)
+    is_capacity_real = Column(Boolean)
+    properties = Column(JSONB(astext_type=Text()), nullable=False, server_default=text("'{}'::jsonb"))
+    modeled = Column(JSONB(astext_type=Text()), nullable=False, server_default=text("'{}'::jsonb"))
+
+    city_function = relationship('CityFunction')
+    city_infrastructure_type = relationship('CityInfrastructureType')
+    city_service_type = relationship('CityServiceType')
+    physical_object = relationship('PhysicalObject')
@@ -0,0 +1,91 @@
+# coding: utf-8
+"""Reference tables without geometry."""
+from sqlalchemy import Boolean, CheckConstraint, Column, Float, ForeignKey, Integer, SmallInteger, String, text
+from sqlalchemy.orm import relationship
+
+from db_utility.mapping.base import Base
+
+
+class AdministrativeUnitType(Base):
+    __tablename__ = 'administrative_unit_types'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('administrative_unit_types_id_seq'::regclass)"))
+    full_name = Column(String(50), nullable=False, unique=True)
+    short_name = Column(String(10), nullable=False, unique=True)
+
+
+class CityInfrastructureType(Base):
+    __tablename__ = 'city_infrastructure_types'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('city_infrastructure_types_id_seq'::regclass)"))
+    name = Column(String(50), nullable=False, unique=True)
+    code = Column(String(50), nullable=False, unique=True)
+
+
+class LivingSituation(Base):
+    __tablename__ = 'living_situations'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('living_situations_id_seq'::regclass)"))
+    name = Column(String, nullable=False, unique=True)
+
+
+class MunicipalityType(Base):
+    __tablename__ = 'municipality_types'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('municipality_types_id_seq'::regclass)"))
+    full_name = Column(String(50), nullable=False, unique=True)
+    short_name = Column(String(10), nullable=False, unique=True)
+
+
+class SocialGroup(Base):
+    __tablename__ = 'social_groups'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('social_groups_id_seq'::regclass)"))
+    name = Column(String, nullable=False, unique=True)
+    code = Column(String, nullable=False, unique=True)
+    parent_id = Column(ForeignKey('social_groups.id', deferrable=True, initially='DEFERRED'))
+    social_group_value = Column(Float(53))
+
+    parent = relationship('SocialGroup', remote_side=[id])
+
+
+class SpatialRefSy(Base):
+    __tablename__ = 'spatial_ref_sys'
+    __table_args__ = (
+        CheckConstraint('(srid > 0) AND (srid <= 998999)'),
+    )
+
+    srid = Column(Integer, primary_key=True)
+    auth_name = Column(String(256))
+    auth_srid = Column(Integer)
+    srtext = Column(String(2048))
+    proj4text = Column(String(2048))
+
+
+class CityFunction(Base):
+    __tablename__ = 'city_functions'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('city_functions_id_seq'::regclass)"))
+    city_infrastructure_type_id = Column(ForeignKey('city_infrastructure_types.id'))
+    name = Column(String(50), nullable=False, unique=True)
+    code = Column(String(50), nullable=False, unique=True)
+
+    city_infrastructure_type = relationship('CityInfrastructureType')
+
+
+class CityServiceType(Base):
+    __tablename__ = 'city_service_types'
+
+    id = Column(Integer, primary_key=True, server_default=text("nextval('city_service_types_id_seq'::regclass)"))
+    city_function_id = Column(ForeignKey('city_functions.id'), nullable=False)
+    name = Column(String(50), nullable=False, unique=True)
+    code = Column(String(50), nullable=False, unique=True)
+    capacity_min = Column(Integer, nullable=False)
+    capacity_max = Column(Integer, nullable=False)
+    status_min = Column(SmallInteger, nullable=False)
+    status_max = Column(SmallInteger, nullable=False)
+    is_building = Column(Boolean, nullable=False)
+    public_transport_time_normative = Column(Integer)
+    walking_radius_normative = Column(Integer)
+
+    city_function = relationship('CityFunction')
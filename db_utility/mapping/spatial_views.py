@@ -0,0 +1,186 @@
+# coding: utf-8
+"""Views with geometry columns, they need geoalchemy2."""
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, SmallInteger, String, Table, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from geoalchemy2.types import Geometry
+
+from db_utility.mapping.base import metadata
+
+
+t_all_buildings = Table(
+    'all_buildings', metadata,
+    Column('building_id', Integer),
+    Column('physical_object_id', Integer),
+    Column('address', String(200)),
+    Column('project_type', String(100)),
+    Column('building_year', SmallInteger),
+    Column('repair_years', String(100)),
+    Column('building_area', Float),
+    Column('living_area', Float),
+    Column('storeys_count', SmallInteger),
+    Column('central_heating', Boolean),
+    Column('central_hotwater', Boolean),
+    Column('central_water', Boolean),
+    Column('central_electro', Boolean),
+    Column('central_gas', Boolean),
+    Column('refusechute', Boolean),
+    Column('ukname', String(100)),
+    Column('lift_count', SmallInteger),
+    Column('failure', Boolean),
+    Column('is_living', Boolean),
+    Column('resident_number', SmallInteger),
+    Column('population_balanced', SmallInteger),
+    Column('properties', JSONB(astext_type=Text())),
+    Column('modeled', JSONB(astext_type=Text())),
+    Column('functional_object_id', Integer),
+    Column('osm_id', String(50)),
+    Column('geometry', Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('center', Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('city', String(50)),
+    Column('city_id', Integer),
+    Column('administrative_unit', String(50)),
+    Column('administrative_unit_id', Integer),
+    Column('municipality', String(50)),
+    Column('municipality_id', Integer),
+    Column('block_id', Integer),
+    Column('functional_object_created_at', DateTime(True)),
+    Column('functional_object_updated_at', DateTime(True)),
+    Column('physical_object_created_at', DateTime(True)),
+    Column('physical_object_updated_at', DateTime(True)),
+    Column('updated_at', DateTime(True)),
+    Column('created_at', DateTime(True))
+)
+
+
+t_all_houses = Table(
+    'all_houses', metadata,
+    Column('building_id', Integer),
+    Column('physical_object_id', Integer),
+    Column('address', String(200)),
+    Column('project_type', String(100)),
+    Column('building_year', SmallInteger),
+    Column('repair_years', String(100)),
+    Column('building_area', Float),
+    Column('living_area', Float),
+    Column('storeys_count', SmallInteger),
+    Column('central_heating', Boolean),
+    Column('central_hotwater', Boolean),
+    Column('central_water', Boolean),
+    Column('central_electro', Boolean),
+    Column('central_gas', Boolean),
+    Column('refusechute', Boolean),
+    Column('ukname', String(100)),
+    Column('lift_count', SmallInteger),
+    Column('failure', Boolean),
+    Column('is_living', Boolean),
+    Column('resident_number', SmallInteger),
+    Column('population_balanced', SmallInteger),
+    Column('properties', JSONB(astext_type=Text())),
+    Column('modeled', JSONB(astext_type=Text())),
+    Column('functional_object_id', Integer),
+    Column('osm_id', String(50)),
+    Column('geometry', Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('center', Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('city', String(50)),
+    Column('city_id', Integer),
+    Column('administrative_unit', String(50)),
+    Column('administrative_unit_id', Integer),
+    Column('municipality', String(50)),
+    Column('municipality_id', Integer),
+    Column('block_id', Integer),
+    Column('functional_object_created_at', DateTime(True)),
+    Column('functional_object_updated_at', DateTime(True)),
+    Column('physical_object_created_at', DateTime(True)),
+    Column('physical_object_updated_at', DateTime(True)),
+    Column('updated_at', DateTime(True)),
+    Column('created_at', DateTime(True))
+)
+
+
+t_all_services = Table(
+    'all_services', metadata,
+    Column('functional_object_id', Integer),
+    Column('physical_object_id', Integer),
+    Column('building_id', Integer),
+    Column('geometry', Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('center', Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('city_service_type', String(50)),
+    Column('city_service_type_id', Integer),
+    Column('city_service_type_code', String(50)),
+    Column('city_function', String(50)),
+    Column('city_function_id', Integer),
+    Column('city_function_code', String(50)),
+    Column('infrastructure_type', String(50)),
+    Column('infrastructure_type_id', Integer),
+    Column('infrastructure_type_code', String(50)),
+    Column('service_name', String(200)),
+    Column('opening_hours', String(200)),
+    Column('website', String(200)),
+    Column('phone', String(100)),
+    Column('capacity', Integer),
+    Column('is_capacity_real', Boolean),
+    Column('address', String(200)),
+    Column('is_living', Boolean),
+    Column('city', String(50)),
+    Column('city_id', Integer),
+    Column('administrative_unit', String(50)),
+    Column('administrative_unit_id', Integer),
+    Column('municipality', String(50)),
+    Column('municipality_id', Integer),
+    Column('block_id', Integer),
+    Column('building_properties', JSONB(astext_type=Text())),
+    Column('functional_object_properties', JSONB(astext_type=Text())),
+    Column('building_modeled', JSONB(astext_type=Text())),
+    Column('functional_object_modeled', JSONB(astext_type=Text())),
+    Column('functional_object_created_at', DateTime(True)),
+    Column('functional_object_updated_at', DateTime(True)),
+    Column('physical_object_created_at', DateTime(True)),
+    Column('physical_object_updated_at', DateTime(True)),
+    Column('updated_at', DateTime(True)),
+    Column('created_at', DateTime(True))
+)
+
+
+t_houses = Table(
+    'houses', metadata,
+    Column('building_id', Integer),
+    Column('physical_object_id', Integer),
+    Column('address', String(200)),
+    Column('project_type', String(100)),
+    Column('building_year', SmallInteger),
+    Column('repair_years', String(100)),
+    Column('building_area', Float),
+    Column('living_area', Float),
+    Column('storeys_count', SmallInteger),
+    Column('central_heating', Boolean),
+    Column('central_hotwater', Boolean),
+    Column('central_water', Boolean),
+    Column('central_electro', Boolean),
+    Column('central_gas', Boolean),
+    Column('refusechute', Boolean),
+    Column('ukname', String(100)),
+    Column('lift_count', SmallInteger),
+    Column('failure', Boolean),
+    Column('is_living', Boolean),
+    Column('resident_number', SmallInteger),
+    Column('population_balanced', SmallInteger),
+    Column('properties', JSONB(astext_type=Text())),
+    Column('modeled', JSONB(astext_type=Text())),
+    Column('functional_object_id', Integer),
+    Column('osm_id', String(50)),
+    Column('geometry', Geometry(srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('center', Geometry('POINT', 4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry')),
+    Column('city', String(50)),
+    Column('city_id', Integer),
+    Column('administrative_unit', String(50)),
+    Column('administrative_unit_id', Integer),
+    Column('municipality', String(50)),
+    Column('municipality_id', Integer),
+    Column('block_id', Integer),
+    Column('functional_object_created_at', DateTime(True)),
+    Column('functional_object_updated_at', DateTime(True)),
+    Column('physical_object_created_at', DateTime(True)),
+    Column('physical_object_updated_at', DateTime(True)),
+    Column('updated_at', DateTime(True)),
+    Column('created_at', DateTime(True))
+)
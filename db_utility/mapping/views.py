@@ -0,0 +1,76 @@
+# coding: utf-8
+"""Views without geometry columns."""
+from sqlalchemy import Column, DateTime, Integer, String, Table, Text
+
+from db_utility.mapping.base import metadata
+
+
+t_administrative_division = Table(
+    'administrative_division', metadata,
+    Column('city_id', Integer),
+    Column('city', String(50)),
+    Column('city_code', String(50)),
+    Column('administrative_unit_id', Integer),
+    Column('administrative_unit', String(50)),
+    Column('municipality_id', Integer),
+    Column('municipality', String(50))
+)
+
+
+t_cities_statistics = Table(
+    'cities_statistics', metadata,
+    Column('id', Integer),
+    Column('name', String(50)),
+    Column('unique_service_types', Integer),
+    Column('total_services', Integer),
+    Column('living_houses', Integer),
+    Column('buildings', Integer),
+    Column('updated_at', DateTime(True))
+)
+
+
+t_geography_columns = Table(
+    'geography_columns', metadata,
+    Column('f_table_catalog', String),
+    Column('f_table_schema', String),
+    Column('f_table_name', String),
+    Column('f_geography_column', String),
+    Column('coord_dimension', Integer),
+    Column('srid', Integer),
+    Column('type', Text)
+)
+
+
+t_geometry_columns = Table(
+    'geometry_columns', metadata,
+    Column('f_table_catalog', String(256)),
+    Column('f_table_schema', String),
+    Column('f_table_name', String),
+    Column('f_geometry_column', String),
+    Column('coord_dimension', Integer),
+    Column('srid', Integer),
+    Column('type', String(30))
+)
+
+
+t_service_hierarchy = Table(
+    'service_hierarchy', metadata,
+    Column('infrastructure_id', Integer),
+    Column('infrastructure', String(50)),
+    Column('infrastructure_code', String(50)),
+    Column('city_function_id', Integer),
+    Column('city_function', String(50)),
+    Column('city_function_code', String(50)),
+    Column('city_service_type_id', Integer),
+    Column('city_service_type', String(50)),
+    Column('city_service_type_code', String(50))
+)
+
+
+t_table_sizes = Table(
+    'table_sizes', metadata,
+    Column('table_name', Text),
+    Column('table_size', Text),
+    Column('indexes_size', Text),
+    Column('total_size', Text)
+)
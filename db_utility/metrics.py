@@ -0,0 +1,156 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import typing
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Счётчики открытых этапов текущего контекста (потока или asyncio-задачи), внешний этап считает и вложенные
+_stage_round_trips: contextvars.ContextVar[typing.Tuple[typing.List[int], ...]] = contextvars.ContextVar(
+    "stage_round_trips", default=()
+)
+_instrumented_engines = set()
+_active_stages = 0
+_active_stages_lock = threading.Lock()
+
+
+def count_round_trip(*args):
+    """Adds a round trip to the stages open in the current thread or asyncio task.
+
+    ``before_cursor_execute`` does not fire for COPY through the raw DBAPI cursor, so it is called explicitly there.
+    """
+    for counter in _stage_round_trips.get():
+        counter[0] += 1
+
+
+def instrument_engine(engine: sa.Engine):
+    """Counts statements sent through ``engine``, each of them is one round trip to the database."""
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+    sa.event.listen(engine, "before_cursor_execute", count_round_trip)
+
+
+def _reset_peak_rss():
+    # На Linux пиковый RSS процесса можно сбросить, тогда он будет пиком этапа, а не всего запуска
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> typing.Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss в килобайтах на Linux и в байтах на macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if os.uname().sysname == "Darwin" else peak / 1024
+
+
+class StageMetrics:
+    """Wall time, rows, peak RSS and database round trips of pipeline stages.
+
+    Round trips are counted per stage: only statements sent from the thread or asyncio task that opened the stage
+    are counted, so stages of cities processed concurrently do not mix. Peak RSS is a process-wide value,
+    it is reset only when no other stage is open, so for overlapping stages it is the peak since the first of them began.
+    """
+
+    def __init__(self):
+        self.records: typing.List[dict] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **labels):
+        """Records a stage, the number of processed rows is set through the yielded record: ``record["rows"] = n``."""
+        global _active_stages
+        record = {"stage": name, **labels, "rows": None}
+        with _active_stages_lock:
+            if _active_stages == 0:
+                _reset_peak_rss()
+            _active_stages += 1
+        round_trips = [0]
+        token = _stage_round_trips.set(_stage_round_trips.get() + (round_trips,))
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            record["peak_rss_mb"] = _peak_rss_mb()
+            record["db_round_trips"] = round_trips[0]
+            _stage_round_trips.reset(token)
+            with _active_stages_lock:
+                _active_stages -= 1
+            record["finished_at"] = datetime.now(timezone.utc).isoformat()
+            with self._lock:
+                self.records.append(record)
+
+    def drain(self) -> typing.List[dict]:
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def export(self, path: str, records: typing.Optional[typing.List[dict]] = None):
+        """Appends records to a JSON lines file, or writes a Prometheus textfile when ``path`` ends with ``.prom``."""
+        records = self.drain() if records is None else records
+        if path.endswith(".prom"):
+            write_prometheus(path, records)
+        else:
+            with open(path, "a", encoding="UTF-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(path: str, records: typing.List[dict]):
+    metrics = {
+        "seconds": ("building_fixes_stage_seconds", "Wall time of the stage", sum),
+        "rows": ("building_fixes_stage_rows", "Rows processed by the stage", sum),
+        "peak_rss_mb": ("building_fixes_stage_peak_rss_megabytes", "Peak resident memory during the stage", max),
+        "db_round_trips": ("building_fixes_stage_db_round_trips", "Statements sent to the database during the stage", sum),
+    }
+    label_names = sorted({key for record in records for key in record if key not in metrics and key != "finished_at"})
+    # Один этап может выполняться несколько раз (например, по тайлам), серии с одинаковыми метками сводятся в одну
+    series: typing.Dict[tuple, typing.Dict[str, list]] = {}
+    for record in records:
+        labels = tuple(str(record.get(name, "") or "") for name in label_names)
+        values = series.setdefault(labels, {field: [] for field in metrics})
+        for field in metrics:
+            if record.get(field) is not None:
+                values[field].append(record[field])
+    lines = []
+    for field, (metric, help_, aggregate) in metrics.items():
+        lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} gauge"]
+        for labels, values in series.items():
+            if not values[field]:
+                continue
+            labels_text = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(label_names, labels))
+            lines.append(f"{metric}{{{labels_text}}} {aggregate(values[field])}")
+    # textfile collector читает файл целиком, поэтому подменяем его атомарно
+    with open(f"{path}.tmp", "w", encoding="UTF-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(f"{path}.tmp", path)
+
+
+# Общий сборщик процесса, этапы всех инструментов пишутся в него
+collector = StageMetrics()
+stage = collector.stage
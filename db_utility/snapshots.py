@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import typing
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow.compute as pc
+
+
+class SnapshotCache:
+    """GeoParquet snapshots of city tables with the watermark of the last download.
+
+    The watermark is the database server time taken before the download, so rows changed during the download
+    are downloaded again next time, and client clock skew does not matter.
+    """
+
+    def __init__(self, directory: str = "data"):
+        self.directory = directory
+
+    def _path(self, city_name: str, table: str) -> str:
+        return os.path.join(self.directory, f"{table}_{city_name}.parquet")
+
+    def _meta_path(self, city_name: str, table: str) -> str:
+        return os.path.join(self.directory, f"{table}_{city_name}.json")
+
+    def exists(self, city_name: str, table: str) -> bool:
+        return os.path.exists(self._path(city_name, table))
+
+    def watermark(self, city_name: str, table: str) -> typing.Optional[pd.Timestamp]:
+        if not self.exists(city_name, table) or not os.path.exists(self._meta_path(city_name, table)):
+            return None
+        with open(self._meta_path(city_name, table), encoding="UTF-8") as f:
+            watermark = json.load(f).get("watermark")
+        return pd.Timestamp(watermark) if watermark else None
+
+    def read(
+        self,
+        city_name: str,
+        table: str,
+        columns: typing.Optional[typing.List[str]] = None,
+        bbox: typing.Optional[typing.Tuple[float, float, float, float]] = None,
+        points_only: bool = False,
+    ) -> gpd.GeoDataFrame:
+        """Reads the snapshot, only row groups and rows intersecting ``bbox`` are read when it is given."""
+        logging.info(f"Reading {city_name}'s {table} snapshot")
+        filters = None
+        if points_only:
+            # у точек охват вырожден, так что их можно отобрать по колонке bbox, не разбирая геометрию
+            filters = (pc.field("bbox", "xmin") == pc.field("bbox", "xmax")) & (
+                pc.field("bbox", "ymin") == pc.field("bbox", "ymax")
+            )
+        gdf = gpd.read_parquet(
+            self._path(city_name, table), columns=columns, bbox=bbox, filters=filters, memory_map=True
+        )
+        if points_only:
+            gdf = gdf[gdf.geometry.type == "Point"]
+        logging.info(f"Done reading {table}!\n")
+        return gdf
+
+    def write(
+        self, city_name: str, table: str, gdf: gpd.GeoDataFrame, watermark: typing.Optional[pd.Timestamp] = None
+    ):
+        """Saves the snapshot, ``watermark`` should be the server time taken before ``gdf`` was downloaded."""
+        os.makedirs(self.directory, exist_ok=True)
+        gdf.to_parquet(self._path(city_name, table), index=False, write_covering_bbox=True)
+        with open(self._meta_path(city_name, table), "w", encoding="UTF-8") as f:
+            json.dump(
+                {
+                    "watermark": None if watermark is None else pd.Timestamp(watermark).isoformat(),
+                    "rows": gdf.shape[0],
+                },
+                f,
+            )
+        logging.info(f"Saved {city_name}'s {table} snapshot with {gdf.shape[0]} rows")
+
+    def update(
+        self,
+        city_name: str,
+        table: str,
+        changed: gpd.GeoDataFrame,
+        live_ids: typing.Iterable[int],
+        watermark: typing.Optional[pd.Timestamp] = None,
+    ) -> gpd.GeoDataFrame:
+        """Merges rows changed since the watermark into the snapshot and drops rows deleted in the database."""
+        gdf = self.read(city_name, table)
+        gdf = gdf[~gdf["id"].isin(changed["id"]) & gdf["id"].isin(pd.Index(live_ids))]
+        gdf = pd.concat([gdf, changed.to_crs(gdf.crs)], ignore_index=True) if changed.shape[0] > 0 else gdf
+        logging.info(f"{changed.shape[0]} {table} row(s) of {city_name} changed since the last snapshot")
+        self.write(city_name, table, gdf, watermark)
+        return gdf
+
+
+class WatermarkStore:
+    """Per-city ``updated_at`` watermarks of incremental runs, one small JSON file per city."""
+
+    def __init__(self, directory: str = "data"):
+        self.directory = directory
+
+    def _path(self, city_name: str) -> str:
+        return os.path.join(self.directory, f"watermark_{city_name}.json")
+
+    def get(self, city_name: str) -> typing.Optional[pd.Timestamp]:
+        if not os.path.exists(self._path(city_name)):
+            return None
+        with open(self._path(city_name), encoding="UTF-8") as f:
+            watermark = json.load(f).get("watermark")
+        return pd.Timestamp(watermark) if watermark else None
+
+    def set(self, city_name: str, watermark: pd.Timestamp):
+        os.makedirs(self.directory, exist_ok=True)
+        # пишем во временный файл и подменяем, чтобы прерванный запуск не испортил водяной знак
+        with open(f"{self._path(city_name)}.tmp", "w", encoding="UTF-8") as f:
+            json.dump({"watermark": pd.Timestamp(watermark).isoformat()}, f)
+        os.replace(f"{self._path(city_name)}.tmp", self._path(city_name))
+
+
+class ApplyJournal:
+    """Plan and progress of a city's apply phase, so an interrupted apply resumes from the last committed chunk.
+
+    The plan (services to move and building-points to remove) is written once, the progress file only keeps
+    the number of committed chunks.
+    """
+
+    def __init__(self, directory: str = "data"):
+        self.directory = directory
+
+    def _plan_path(self, city_name: str) -> str:
+        return os.path.join(self.directory, f"apply_{city_name}.json")
+
+    def _progress_path(self, city_name: str) -> str:
+        return os.path.join(self.directory, f"apply_{city_name}.progress")
+
+    def pending(self, city_name: str) -> bool:
+        return os.path.exists(self._plan_path(city_name))
+
+    def start(self, city_name: str, services: pd.DataFrame, points: pd.DataFrame, batch_size: int):
+        os.makedirs(self.directory, exist_ok=True)
+        plan = {
+            "batch_size": batch_size,
+            "services": services[["id", "physical_object_id", "from_physical_object_id"]].astype(int).values.tolist(),
+            "points": points[["id", "physical_object_id"]].astype(int).values.tolist(),
+        }
+        with open(f"{self._plan_path(city_name)}.tmp", "w", encoding="UTF-8") as f:
+            json.dump(plan, f)
+        self.commit_chunk(city_name, 0)
+        os.replace(f"{self._plan_path(city_name)}.tmp", self._plan_path(city_name))
+
+    def load(self, city_name: str) -> typing.Tuple[pd.DataFrame, pd.DataFrame, int, int]:
+        """Returns services, points, batch size and the number of committed chunks."""
+        with open(self._plan_path(city_name), encoding="UTF-8") as f:
+            plan = json.load(f)
+        completed = 0
+        if os.path.exists(self._progress_path(city_name)):
+            with open(self._progress_path(city_name), encoding="UTF-8") as f:
+                completed = int(f.read().strip() or 0)
+        services = pd.DataFrame(plan["services"], columns=["id", "physical_object_id", "from_physical_object_id"])
+        points = pd.DataFrame(plan["points"], columns=["id", "physical_object_id"])
+        return services, points, plan["batch_size"], completed
+
+    def commit_chunk(self, city_name: str, completed: int):
+        with open(f"{self._progress_path(city_name)}.tmp", "w", encoding="UTF-8") as f:
+            f.write(str(completed))
+        os.replace(f"{self._progress_path(city_name)}.tmp", self._progress_path(city_name))
+
+    def finish(self, city_name: str):
+        for path in (self._plan_path(city_name), self._progress_path(city_name)):
+            if os.path.exists(path):
+                os.remove(path)
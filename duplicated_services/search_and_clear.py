@@ -1,18 +1,36 @@
 import json
 import logging
 import os
+import typing
 
 import pandas as pd
 
-from db_utility import dbTools
+from db_utility import dbTools, metrics
 
+TOOL = "duplicated_services"
 
-def main():
+
+def select_services_to_delete(df: pd.DataFrame) -> typing.Tuple[pd.DataFrame, pd.DataFrame]:
+    # В каждом здании удаляются сервисы без названия; если без названия все - удаляется только первый
+    group_columns = ["city_service_type_id", "building_id"]
+    unnamed = df["service_name"].str.endswith(" без названия)", na=False)
+    all_unnamed = unnamed.groupby([df[column] for column in group_columns]).transform("all")
+    first_in_group = ~df.duplicated(group_columns)
+    services_to_delete = df[unnamed & (~all_unnamed | first_in_group)]
+    unnamed_buildings = df.loc[all_unnamed & first_in_group, group_columns]
+    return services_to_delete, unnamed_buildings
+
+
+def main(db: typing.Optional[dbTools.DBworker] = None):
     with open(os.path.join(os.path.dirname(__file__), "config.json"), encoding="UTF-8") as f:
         config_imputation = json.load(f)
         sql_connection = config_imputation["sqlConnection"]
         dry_run = config_imputation["dry_run"]
         service_ids = config_imputation["service_ids"]
+        city = config_imputation.get("city")
+        statement_timeout = config_imputation.get("statement_timeout")
+        pgbouncer = config_imputation.get("pgbouncer", False)
+        metrics_file = config_imputation.get("metrics_file")
     log_file_name = "search_and_clear.log"
     logging.basicConfig(
         level=logging.INFO,
@@ -25,44 +43,49 @@ def main():
         ],
     )
 
-    db = dbTools.DBworker(sql_connection)
+    # Задание из нескольких утилит передаёт общий DBworker с отложенным обновлением представлений
+    if db is None:
+        db = dbTools.DBworker(sql_connection, statement_timeout=statement_timeout, pgbouncer=pgbouncer)
 
-    services_to_delete = pd.DataFrame()
+    with metrics.stage("download", tool=TOOL, city=city) as stage:
+        all_duplicates = db.get_buildings_with_same_services(service_ids, city)
+        stage["rows"] = all_duplicates.shape[0]
+    with metrics.stage("filter", tool=TOOL, city=city) as stage:
+        services_to_delete, unnamed_buildings = select_services_to_delete(all_duplicates)
+        stage["rows"] = all_duplicates.shape[0]
 
     for service_id in service_ids:
-        df = db.get_buildings_with_same_service(service_id)
-        service_name = df["city_service_type"][0]
-        grouped_df = df.groupby("building_id")
+        df = all_duplicates[all_duplicates["city_service_type_id"] == service_id]
+        if df.shape[0] == 0:
+            logging.info(f"No buildings with duplicated services for service id {service_id}.")
+            continue
+        service_name = df["city_service_type"].iloc[0]
 
         logging.info(
             f"Filtering data based on service names ending with '(без названия)' for service id {service_id} {service_name}."
         )
-        count = 0
-        for key, item in grouped_df:
-            rows_to_delete = item[item["service_name"].str.endswith(" без названия)")]
-            if rows_to_delete.shape[0] == item.shape[0]:
-                rows_to_delete = rows_to_delete.head(1)
-                logging.info(
-                    f"In the building with ID {item['building_id'].iloc[0]}, all services with ID {service_id} {service_name} have no names. Keeping only one."
-                )
-            services_to_delete = pd.concat(
-                [services_to_delete, rows_to_delete.copy()], ignore_index=True
+        for building_id in unnamed_buildings.loc[
+            unnamed_buildings["city_service_type_id"] == service_id, "building_id"
+        ]:
+            logging.info(
+                f"In the building with ID {building_id}, all services with ID {service_id} {service_name} have no names. Keeping only one."
             )
-            count += rows_to_delete.shape[0]
+        count = (services_to_delete["city_service_type_id"] == service_id).sum()
         logging.info(
             f"Found {count} services with id {service_id} {service_name} without name.",
         )
     logging.info(
         f"Found {services_to_delete.shape[0]} services for deletion at all.",
     )
-    if services_to_delete.shape[0] == 0:
-        exit()
-    ids = set(services_to_delete["functional_object_id"].tolist())
-
-    if dry_run:
+    if services_to_delete.shape[0] > 0 and dry_run:
         logging.info("The config specifies a dry run, data will not be saved.")
-    else:
-        db.remove_services(fuctional_object_ids=ids)
+    elif services_to_delete.shape[0] > 0:
+        ids = set(services_to_delete["functional_object_id"].tolist())
+        with metrics.stage("delete", tool=TOOL, city=city) as stage:
+            db.remove_services(fuctional_object_ids=ids)
+            stage["rows"] = len(ids)
+    if metrics_file:
+        metrics.collector.export(os.path.join(os.getcwd(), metrics_file))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,747 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import time
+import typing
+from json import JSONDecodeError
+
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import LineString, Point, geometry, wkt
+from shapely.ops import nearest_points, substring
+
+from public_transport_graph.osm_cache import OSMCache
+
+OVERPASS_URL = "http://lz4.overpass-api.de/api/interpreter"
+
+# Линии маршрута, которые ближе друг к другу, чем это расстояние (в метрах), считаются соединёнными
+# (прежняя сборка буферизовала на 0.01 только одну из линий, так что порог тот же)
+CONNECTION_DISTANCE = 0.01
+# Точность совпадения линий, как у almost_equals с decimal=6
+EQUAL_LINES_TOLERANCE = 0.5 * 10**-6
+# Число маршрутов в одной задаче пула процессов
+ROUTES_CHUNK_SIZE = 25
+
+# Кэш ответов Overpass и графов OSMnx, общий для всех функций модуля
+cache = OSMCache()
+
+
+def configure_cache(directory="osm_cache", ttl=24 * 3600, offline=False, fixtures=()):
+    """Sets the cache used by the module, see ``OSMCache``. ``offline=True`` builds graphs without network access
+    from the cache directory and ``fixtures`` only."""
+    global cache
+    cache = OSMCache(directory, ttl, offline, fixtures)
+
+
+class OverpassError(Exception):
+    """Overpass API answered with an error, for example a query timeout reported in ``remark``."""
+
+
+def _check_overpass_response(response):
+    # при тайм-ауте или нехватке памяти Overpass возвращает 200 с remark и пустым или неполным elements
+    if "remark" in response or "error" in response or "elements" not in response:
+        raise OverpassError(f"Overpass API returned an error: {response.get('remark') or response.get('error')}")
+
+
+def _overpass_request(overpass_query):
+    def fetch():
+        import requests
+
+        result = requests.get(OVERPASS_URL, params={'data': overpass_query})
+        return result.json()
+
+    return cache.get_json(
+        "overpass", {"url": OVERPASS_URL, "query": overpass_query}, fetch, validate=_check_overpass_response
+    )
+
+
+def get_boundary(osm_id):
+
+    overpass_query = f"""
+    [out:json];
+            (
+              relation({osm_id});
+            );
+    out geom;
+    """
+    json_result = _overpass_request(overpass_query)
+
+    return json_result
+
+
+def get_routes(osm_id, public_transport_type):
+
+    overpass_query = f"""
+    [out:json];
+            (
+                relation({osm_id});
+            );map_to_area;
+            (
+                relation(area)['route'='{public_transport_type}'];
+            );
+    out geom;
+    """
+    json_result = _overpass_request(overpass_query)["elements"]
+
+    return pd.DataFrame(json_result)
+
+
+def overpass_query(func, *args, attempts=5):
+
+    for i in range(attempts):
+        try:
+            return func(*args)
+        except (JSONDecodeError, OverpassError) as e:
+            logging.warning(f"Overpass request failed, retrying: {e}")
+            print("Another attempt to get response from Overpass API...")
+            time.sleep(20)
+            continue
+
+    raise SystemError(
+    """Something went wrong with Overpass API when JSON was parsed or it returned an error. Check the query and to send it later.""")
+
+
+def parse_overpass_route_response(loc, city_crs, boundary):
+
+    route = pd.DataFrame(loc['members'])
+    ways = route[route['type'] == 'way']
+    if len(ways) > 0:
+        ways = gpd.GeoDataFrame(
+            geometry=[LineString([(node["lon"], node["lat"]) for node in way]) for way in ways['geometry']], crs=4326
+        )
+        if ways.within(boundary).all():
+            # fix topological errors and then make LineString from MultiLineString
+            ways = get_linestring(ways.to_crs(city_crs))
+        else:
+            ways = None
+    else:
+        ways = None
+
+    if "node" in route["type"].unique():
+        platforms = route[route['type'] == 'node'][["lat", "lon"]].reset_index(drop = True)
+        platforms = platforms.apply(lambda x: Point(x["lon"], x["lat"]), axis=1)
+    else:
+        platforms = None
+
+    return pd.Series({"way": ways, "platforms": platforms})
+
+
+def get_linestring(route):
+    """Assembles the ways of a route into one LineString.
+
+    Duplicated ways are dropped, the rest are connected when they lie within ``CONNECTION_DISTANCE`` of each other,
+    and the longest chain of connected ways starting from a dead end is merged. Returns None when the ways
+    have no dead ends (a ring or a single way).
+    """
+    lines = np.asarray(route.geometry)
+
+    # один запрос к STRtree вместо попарного сравнения всех линий маршрута
+    left, right = shapely.STRtree(lines).query(lines)
+    equal = (left > right) & shapely.equals_exact(lines[left], lines[right], tolerance=EQUAL_LINES_TOLERANCE)
+    lines = np.delete(lines, np.unique(left[equal]))
+
+    left, right = shapely.STRtree(lines).query(lines, predicate="dwithin", distance=CONNECTION_DISTANCE)
+    adjacency = {i: [] for i in range(len(lines))}
+    for i, j in sorted(zip(left[left != right].tolist(), right[left != right].tolist())):
+        adjacency[i].append(j)
+
+    dead_ends = [i for i, neighbors in adjacency.items() if len(neighbors) == 1]
+    if not dead_ends:
+        return None
+    sequence, covered = [], set()
+    for start in dead_ends:
+        # цепочка из уже пройденного тупика та же, что найдена с другого её конца
+        if start in covered:
+            continue
+        chain = _walk_lines(adjacency, start)
+        covered.update(chain)
+        if len(chain) > len(sequence):
+            sequence = chain
+
+    lines = lines[sequence]
+    previous, following = lines[:-1], lines[1:]
+    # следующую линию разворачиваем, если к предыдущей ближе её конец, а не начало
+    joints = shapely.get_point(shapely.shortest_line(previous, following), 1)
+    reverse = shapely.distance(shapely.get_point(following, -1), joints) < shapely.distance(
+        shapely.get_point(following, 0), joints
+    )
+    following = np.where(reverse, shapely.reverse(following), following)
+    coords = shapely.get_coordinates(np.concatenate([lines[:1], following]))
+    _, first_index = np.unique(coords, axis=0, return_index=True)
+
+    return LineString(coords[np.sort(first_index)])
+
+
+def _walk_lines(adjacency: typing.Dict[int, typing.List[int]], start: int) -> typing.List[int]:
+    sequence, visited = [start], {start}
+    while True:
+        candidates = [line for line in adjacency[sequence[-1]] if line not in visited]
+        if len(candidates) > 1:
+            # на развилке идём по ветке, которая дольше тянется без новой развилки, остальные ветки отбрасываем
+            visited.update(candidates)
+            candidates = [max(candidates, key=lambda line: _branch_length(adjacency, line, visited))]
+        if not candidates:
+            return sequence
+        sequence.append(candidates[0])
+        visited.add(candidates[0])
+
+
+def _branch_length(adjacency: typing.Dict[int, typing.List[int]], line: int, visited: typing.Set[int]) -> int:
+    length, seen = 1, {line}
+    while True:
+        candidates = [next_ for next_ in adjacency[line] if next_ not in visited and next_ not in seen]
+        if len(candidates) != 1:
+            return length
+        line = candidates[0]
+        seen.add(line)
+        length += 1
+
+
+"""
+
+Function project_platforms and its supplementary functions are used to project points on lines.
+It is a necessary operation since OpenStreetMap contains two types of points describing
+public transport stops - 'stop' and 'platforms'. The points marked as 'platform' usually
+do not lie on route lines. Moreover some of them are very close to each other and probably
+mean the same stop. To check this, 'project_threshold' value and merge_close_stops function are used.
+
+Function project_platforms takes two arguments - 'loc' which is Series contains rows 'platforms' and 'way'
+and 'city_crs'. 'way' is shapely LineString object, and 'platforms' is Series of shapely Point objects
+
+loc: Series object
+city_crs: int
+
+
+"""
+
+def project_platforms(loc, city_crs):
+
+    project_threshold = 5
+    edge_indent = 10
+
+    platforms = loc["platforms"]
+    line = loc["way"]
+    line_length = line.length
+
+    if platforms is not None:
+        platforms = gpd.GeoSeries(platforms).set_crs(4326).to_crs(city_crs)
+        stops = shapely.get_point(shapely.shortest_line(line, platforms.to_numpy()), 0)
+        stops = merge_close_stops(stops, project_threshold)
+
+        if shapely.distance(shapely.get_point(line, -1), stops[0]) < shapely.distance(shapely.get_point(line, 0), stops[0]):
+            line = shapely.reverse(line)
+
+        stops_distance = shapely.line_locate_point(line, stops)
+        order = np.argsort(stops_distance, kind="stable")
+        stops, stops_distance = stops[order], stops_distance[order]
+        condition = (stops_distance > edge_indent)&(stops_distance < line_length - edge_indent)
+        stops, distance = stops[condition], [0] + stops_distance[condition].tolist() + [line_length]
+
+        if len(stops) > 0:
+            stops = np.concatenate([[shapely.get_point(line, 0)], stops, [shapely.get_point(line, -1)]])
+        else:
+            stops, distance = get_line_from_start_to_end(line, line_length)
+    else:
+        stops, distance = get_line_from_start_to_end(line, line_length)
+
+    stops = [tuple(round(c, 2) for c in xy) for xy in shapely.get_coordinates(stops).tolist()]
+    pathes = [[stops[i], stops[i + 1]] for i in range(len(stops) - 1)]
+
+    return pd.Series({"pathes": pathes, "distance": distance})
+
+
+def merge_close_stops(stops, threshold):
+    """Leaves stops that are at least ``threshold`` apart. Stops are taken from the last one, each kept stop
+    absorbs the stops closer than ``threshold`` to it, so the choice does not depend on anything but the order."""
+
+    left, right = shapely.STRtree(stops).query(stops, predicate="dwithin", distance=threshold)
+    close = shapely.distance(stops[left], stops[right]) < threshold
+    left, right = left[close], right[close]
+    # соседи каждой остановки одним массивом, без попарных расстояний между всеми остановками
+    neighbors = np.split(right[np.argsort(left, kind="stable")], np.cumsum(np.bincount(left, minlength=len(stops)))[:-1])
+
+    keep = np.zeros(len(stops), dtype=bool)
+    absorbed = np.zeros(len(stops), dtype=bool)
+    for i in range(len(stops) - 1, -1, -1):
+        if not absorbed[i]:
+            keep[i] = True
+            absorbed[neighbors[i]] = True
+
+    return stops[keep]
+
+
+def get_line_from_start_to_end(line, line_length):
+
+    start_line = gpd.GeoSeries(Point(line.coords[0]))
+    end_line = gpd.GeoSeries(Point(line.coords[-1]))
+    stops = pd.concat([start_line, end_line]).reset_index(drop=True)
+    distance = [0, line_length]
+
+    return stops, distance
+
+"""
+
+These bunch of functions are used to make spatial union of two graphs.
+
+"""
+
+def get_nearest_edge_geometry(points, G):
+    import osmnx as ox
+
+    G = G.edge_subgraph([(u, v, n) for u, v, n, e in G.edges(data=True, keys=True) if e["type"] == "walk"])
+    G = convert_geometry(G.copy())
+    coords = list(points.geometry.apply(lambda x: list(x.coords)[0]))
+    x = [c[0] for c in list(coords)]
+    y = [c[1] for c in list(coords)]
+    edges, distance = ox.distance.nearest_edges(G, x, y, return_dist=True)
+    edges_geom = list(map(lambda x: (x, G[x[0]][x[1]][x[2]]["geometry"]), edges))
+    edges_geom = pd.DataFrame(edges_geom, index=points.index, columns=["edge_id", "edge_geometry"])
+    edges_geom["distance_to_edge"] = distance
+    return pd.concat([points, edges_geom], axis=1)
+
+def convert_geometry(graph):
+    for u, v, n, data in graph.edges(data=True, keys=True):
+        data["geometry"] = wkt.loads(data["geometry"])
+    return graph
+
+def project_point_on_edge(points_edge_geom):
+
+    points_edge_geom["nearest_point_geometry"] = points_edge_geom.apply(
+        lambda x: nearest_points(x.edge_geometry, x.geometry)[0], axis=1)
+    points_edge_geom["len"] = points_edge_geom.apply(
+        lambda x: x.edge_geometry.length, axis=1)
+    points_edge_geom["len_from_start"] = points_edge_geom.apply(
+        lambda x: x.edge_geometry.project(x.geometry) , axis=1)
+    points_edge_geom["len_to_end"] = points_edge_geom.apply(
+        lambda x: x.edge_geometry.length - x.len_from_start, axis=1)
+
+    return points_edge_geom
+
+
+def update_edges(points_info, G):
+
+    G_with_drop_edges = delete_edges(points_info, G)
+    updated_G, split_points = add_splitted_edges(G_with_drop_edges, points_info)
+    updated_G, split_points = add_connecting_edges(updated_G, split_points)
+
+    return updated_G, split_points
+
+
+def delete_edges(project_points, G):
+
+    bunch_edges = []
+    G_copy = convert_geometry(G.copy())
+    for e in list(project_points["edge_id"]):
+        flag = check_parallel_edge(G_copy, *e)
+        if flag == 2:
+            bunch_edges.extend([(e[0], e[1], e[2]), (e[1], e[0], e[2])])
+        else:
+            bunch_edges.append((e[0], e[1], e[2]))
+
+    bunch_edges = list(set(bunch_edges))
+    G.remove_edges_from(bunch_edges)
+
+    return G
+
+
+def check_parallel_edge(G, u, v, n):
+
+    if u == v:
+        return 1
+    elif G.has_edge(u, v) and G.has_edge(v, u):
+        if G[u][v][n]["geometry"].equals(G[v][u][n]["geometry"]):
+            return 2
+        else:
+            return 1
+    else:
+        return 1
+
+
+def add_splitted_edges(G, split_nodes):
+
+    start_node_idx = max((G.nodes)) + 1
+    split_nodes["node_id"] = range(start_node_idx, start_node_idx + len(split_nodes))
+    nodes_bunch = split_nodes.apply(lambda x: generate_nodes_bunch(x), axis=1)
+    nodes_attr = split_nodes.set_index("node_id").nearest_point_geometry.apply(
+        lambda x: {"x": round(list(x.coords)[0][0], 2), "y": round(list(x.coords)[0][1], 2)}).to_dict()
+    G.add_edges_from(list(nodes_bunch.explode()))
+    nx.set_node_attributes(G, nodes_attr)
+
+    return G, split_nodes
+
+
+def generate_nodes_bunch(split_point):
+
+    edge_pair = []
+    edge_nodes = split_point.edge_id
+    edge_geom_ = split_point.edge_geometry
+    new_node_id = split_point.node_id
+    len_from_start = split_point.len_from_start
+    len_to_end = split_point.len_to_end
+    len_edge = split_point.len
+
+    fst_edge_attr = {
+        'length_meter': len_from_start, "geometry": str(substring(edge_geom_, 0, len_from_start)), "type": "walk",
+        }
+    snd_edge_attr = {
+        'length_meter': len_to_end, "geometry": str(substring(edge_geom_, len_from_start, len_edge)), "type": "walk",
+        }
+    edge_pair.extend([(edge_nodes[0], new_node_id, fst_edge_attr),(new_node_id, edge_nodes[0], fst_edge_attr),
+                      (new_node_id, edge_nodes[1], snd_edge_attr), (edge_nodes[1], new_node_id, snd_edge_attr)])
+
+    return edge_pair
+
+
+def add_connecting_edges(G, split_nodes):
+
+    start_node_idx = split_nodes["node_id"].max() + 1
+    split_nodes["connecting_node_id"] = list(range(start_node_idx, start_node_idx + len(split_nodes)))
+    nodes_attr = split_nodes.set_index("connecting_node_id").geometry.apply(
+        lambda p: {"x": round(p.coords[0][0], 2), "y": round(p.coords[0][1], 2)}
+        ).to_dict()
+    conn_edges = split_nodes.apply(
+        lambda x: (x.node_id, x.connecting_node_id, {
+            "type": "walk", "length_meter": round(x.distance_to_edge, 3),
+            "geometry": str(LineString([x.geometry, x.nearest_point_geometry]))
+            }), axis=1)
+    conn_edges_another_direct = conn_edges.apply(lambda x: (x[1], x[0], x[2]))
+    G.add_edges_from(conn_edges.tolist() + conn_edges_another_direct.tolist())
+    nx.set_node_attributes(G, nodes_attr)
+    return G, split_nodes
+
+
+def join_graph(G_base, G_to_project, points_df):
+    from tqdm import tqdm
+
+    new_nodes = points_df.set_index("node_id_to_project")["connecting_node_id"]
+    for n1, n2, d in tqdm(G_to_project.edges(data=True)):
+        G_base.add_edge(int(new_nodes[n1]), int(new_nodes[n2]), **d)
+        nx.set_node_attributes(
+            G_base, {int(new_nodes[n1]): G_to_project.nodes[n1], int(new_nodes[n2]): G_to_project.nodes[n2]}
+            )
+
+    return G_base
+
+def get_osmnx_graph(city_osm_id, city_crs, graph_type, speed=None):
+    import momepy
+    import osm2geojson
+    import osmnx as ox
+    from tqdm import tqdm
+
+    boundary = overpass_query(get_boundary, city_osm_id)
+    boundary = osm2geojson.json2geojson(boundary)
+    boundary = gpd.GeoDataFrame.from_features(boundary["features"]).set_crs(4326)
+
+    print(f"Extracting and preparing {graph_type} graph...")
+    polygon = boundary["geometry"][0]
+    G_ox = cache.get_object(
+        "osmnx", {"polygon": polygon.wkt, "network_type": graph_type},
+        lambda: ox.graph.graph_from_polygon(polygon=polygon, network_type=graph_type)
+        )
+    G_ox.graph["approach"] = "primal"
+
+    nodes, edges = momepy.nx_to_gdf(G_ox, points=True, lines=True, spatial_weights=False)
+    nodes = nodes.to_crs(city_crs).set_index("nodeID")
+    nodes_coord = nodes.geometry.apply(
+        lambda p: {"x": round(p.coords[0][0], 2), "y": round(p.coords[0][1], 2)}
+        ).to_dict()
+
+    edges = edges[["length", "node_start", "node_end", "geometry"]].to_crs(city_crs)
+    edges["type"] = graph_type
+    edges["geometry"] = edges["geometry"].apply(
+        lambda x: LineString([tuple(round(c, 2) for c in n) for n in x.coords] if x else None)
+        )
+
+    travel_type = "walk" if graph_type == "walk" else "car"
+    if not speed:
+        speed =  4 * 1000 / 60 if graph_type == "walk" else  17 * 1000 / 60
+
+    G = nx.MultiDiGraph()
+    for i, edge in tqdm(edges.iterrows(), total=len(edges)):
+        p1 = int(edge.node_start)
+        p2 = int(edge.node_end)
+        geometry = LineString(
+            ([(nodes_coord[p1]["x"], nodes_coord[p1]["y"]), (nodes_coord[p2]["x"], nodes_coord[p2]["y"])])
+            ) if not edge.geometry else edge.geometry
+        G.add_edge(
+            p1, p2, length_meter=edge.length, geometry=str(geometry), type = travel_type,
+            time_min = round(edge.length / speed, 2)
+            )
+    nx.set_node_attributes(G, nodes_coord)
+    G.graph['crs'] = 'epsg:' + str(city_crs)
+    G.graph['graph_type'] = travel_type + " graph"
+    G.graph[travel_type + ' speed'] = round(speed, 2)
+
+    print(f"{graph_type.capitalize()} graph done!")
+    return G
+
+def public_routes_to_edges(city_osm_id, city_crs, transport_type, speed, boundary):
+    from tqdm import tqdm
+
+    tqdm.pandas()
+    routes = overpass_query(get_routes, city_osm_id, transport_type)
+    print(f"Extracting and preparing {transport_type} routes:")
+
+    try:
+        df_routes = parse_routes(routes, city_crs, boundary, progress=True)
+    except KeyError:
+        print(f"It seems there are no {transport_type} routes in the city. This transport type will be skipped.")
+        return []
+
+    # some stops don't lie on lines, therefore it's needed to project them
+    stop_points = df_routes.apply(lambda x: project_platforms(x, city_crs), axis = 1)
+
+    return stop_points_to_edges(stop_points, transport_type, speed)
+
+
+def parse_routes(routes, city_crs, boundary, progress=False):
+
+    apply = routes.progress_apply if progress else routes.apply
+    df_routes = apply(lambda x: parse_overpass_route_response(x, city_crs, boundary), axis = 1, result_type="expand")
+
+    return gpd.GeoDataFrame(df_routes).dropna(subset=["way"]).set_geometry("way")
+
+
+def stop_points_to_edges(stop_points, transport_type, speed):
+
+    edges = []
+    if len(stop_points) == 0:
+        # apply по пустой таблице не создаёт колонок pathes и distance
+        return edges
+    time_on_stop = 1
+    for i, pathes, distance in zip(stop_points.index, stop_points["pathes"], stop_points["distance"]):
+        for (p1, p2), edge_length in zip(pathes, np.diff(distance).tolist()):
+            d = {"time_min": round(edge_length/speed + time_on_stop, 2), "length_meter": round(edge_length, 2),
+                "type": transport_type, "desc": f"route {i}", "geometry": str(LineString([p1, p2]))}
+            edges.append((p1, p2, d))
+
+    return edges
+
+
+def _routes_chunk_to_edges(routes, city_crs, transport_type, speed, boundary):
+    df_routes = parse_routes(routes, city_crs, boundary)
+    stop_points = df_routes.apply(lambda x: project_platforms(x, city_crs), axis = 1)
+    return stop_points_to_edges(stop_points, transport_type, speed)
+
+
+def _process_pool(workers):
+    # spawn, чтобы дочерние процессы не наследовали состояние ноутбука
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def public_routes_to_edges_parallel(city_osm_id, city_crs, transport_types_speed, boundary, workers,
+                                    chunk_size=ROUTES_CHUNK_SIZE):
+    """The same edges as ``public_routes_to_edges`` called for every transport type in turn, but the routes
+    of all types are split into chunks of ``chunk_size`` routes processed by ``workers`` processes."""
+    print("Getting public routes data from OSM...")
+    # запросы к Overpass идут из основного процесса, через его кэш
+    routes = {
+        transport_type: overpass_query(get_routes, city_osm_id, transport_type)
+        for transport_type in transport_types_speed
+    }
+
+    with _process_pool(workers) as executor:
+        futures = {
+            transport_type: [
+                executor.submit(
+                    _routes_chunk_to_edges, routes[transport_type].iloc[i:i + chunk_size], city_crs, transport_type,
+                    speed, boundary
+                    )
+                for i in range(0, len(routes[transport_type]), chunk_size)
+            ]
+            for transport_type, speed in transport_types_speed.items()
+        }
+
+        # результаты собираются в порядке типов и маршрутов, а не завершения, поэтому граф тот же, что и без пула
+        edges = []
+        for transport_type, chunks in futures.items():
+            print(f"Extracting and preparing {transport_type} routes:")
+            try:
+                type_edges = [edge for chunk in chunks for edge in chunk.result()]
+            except KeyError:
+                type_edges = None
+            if not chunks or type_edges is None:
+                print(f"It seems there are no {transport_type} routes in the city. This transport type will be skipped.")
+            else:
+                edges.extend(type_edges)
+
+    return edges
+
+def graphs_spatial_union(G_base, G_to_project):
+    points = gpd.GeoDataFrame([[n, Point((d["x"], d["y"]))] for n, d in G_to_project.nodes(data=True)],
+                            columns=["node_id_to_project", "geometry"])
+    edges_geom = get_nearest_edge_geometry(points, G_base)
+    projected_point_info = project_point_on_edge(edges_geom)
+    check_point_on_line = projected_point_info.apply(
+        lambda x: x.edge_geometry.buffer(1).contains(x.nearest_point_geometry), axis=1).all()
+    if not check_point_on_line:
+        raise ValueError("Some projected points don't lie on edges")
+    points_on_lines = projected_point_info[(projected_point_info["len_from_start"] != 0)
+                                            & (projected_point_info["len_to_end"] != 0)]
+
+    points_on_points = projected_point_info[~projected_point_info.index.isin(points_on_lines.index)]
+    try:
+        points_on_points["connecting_node_id"] = points_on_points.apply(
+            lambda x: x.edge_id[0] if x.len_from_start == 0 else x.edge_id[1], axis=1
+        )
+    except ValueError:
+        print("No matching nodes were detected, seems like your data is not the same as in OSM. ")
+
+    updated_G_base, points_on_lines = update_edges(points_on_lines, G_base)
+    points_df = pd.concat([points_on_lines, points_on_points])
+    united_graph = join_graph(updated_G_base, G_to_project, points_df)
+    return united_graph
+
+def get_intermodal_graph(city_osm_id, city_crs, gdf_files, public_transport_speeds=None, walk_speed=None,
+                         drive_speed=None, workers=None):
+    G_public_transport: nx.MultiDiGraph = get_public_trasport_graph(city_osm_id, city_crs, gdf_files,
+                                                                    public_transport_speeds, workers)
+    G_walk: nx.MultiDiGraph = get_osmnx_graph(city_osm_id, city_crs, "walk", speed=walk_speed)
+
+    G_drive: nx.MultiDiGraph = get_osmnx_graph(city_osm_id, city_crs, "drive", speed=drive_speed)
+    print("Union of graphs...")
+    G_intermodal = graphs_spatial_union(G_walk, G_drive)
+    if G_public_transport.number_of_edges() > 0:
+        G_intermodal = graphs_spatial_union(G_intermodal, G_public_transport)
+
+    for u, v, d in G_intermodal.edges(data=True):
+        if "time_min" not in d:
+            d["time_min"] = round(d["length_meter"] / G_walk.graph["walk speed"], 2)
+        if "desc" not in d:
+            d["desc"] = ""
+
+    for u, d in G_intermodal.nodes(data=True):
+        if "stop" not in d:
+            d["stop"] = "False"
+        if "desc" not in d:
+            d["desc"] = ""
+
+    G_intermodal.graph["graph_type"] = "intermodal graph"
+    G_intermodal.graph["car speed"] = G_drive.graph["car speed"]
+    G_intermodal.graph.update({k: v for k, v in G_public_transport.graph.items() if "speed" in k})
+    G_intermodal.graph["created by"] = "CityGeoTools"
+
+    print("Intermodal graph done!")
+    return G_intermodal
+
+
+
+def get_public_trasport_graph(city_osm_id, city_crs, gdf_files, transport_types_speed=None, workers=None):
+    G = nx.MultiDiGraph()
+    edegs_different_types = []
+    print("\n")
+    if not transport_types_speed:
+        transport_types_speed = {
+            "subway": 12 * 1000 / 60,
+            "tram": 15 * 1000 / 60,
+            "trolleybus": 12 * 1000 / 60,
+            "bus": 17 * 1000 / 60
+        }
+    from_file = False
+    for transport in gdf_files.values():
+        if transport.get('stops') or transport.get('routes'):
+            from_file = True
+
+    if not from_file:
+        print("Files with routes or with stops was not found. The graph will be built based on data from OSM")
+        import osm2geojson
+
+        boundary = overpass_query(get_boundary, city_osm_id)
+        boundary = osm2geojson.json2geojson(boundary)
+        boundary = geometry.shape(boundary['features'][0]["geometry"])
+
+        if workers and workers > 1:
+            edegs_different_types = public_routes_to_edges_parallel(
+                city_osm_id, city_crs, transport_types_speed, boundary, workers
+                )
+        else:
+            for transport_type, speed in transport_types_speed.items():
+                print("Getting public routes data from OSM...")
+                edges = public_routes_to_edges(city_osm_id, city_crs, transport_type, speed, boundary)
+                edegs_different_types.extend(edges)
+    else:
+        print("Getting public routes data from File...")
+        files_by_type = {}
+        for transport_type, speed in transport_types_speed.items():
+            files = gdf_files.get(transport_type)
+            if not files.get("routes") or not files.get("stops"):
+                print(f"No data provided for \"{transport_type}\", skipping this transport type")
+                continue
+            else:
+                files_by_type[transport_type] = files
+
+        if workers and workers > 1:
+            with _process_pool(workers) as executor:
+                futures = [
+                    executor.submit(
+                        public_routes_to_edges_from_file, city_crs, transport_type,
+                        transport_types_speed[transport_type], files
+                        )
+                    for transport_type, files in files_by_type.items()
+                ]
+                for future in futures:
+                    edegs_different_types.extend(future.result())
+        else:
+            for transport_type, files in files_by_type.items():
+                speed = transport_types_speed[transport_type]
+                edges = public_routes_to_edges_from_file(city_crs, transport_type, speed, files)
+                edegs_different_types.extend(edges)
+
+    G.add_edges_from(edegs_different_types)
+    if len(edegs_different_types)==0:
+        print(f"No data found for public transport, this graph will be empty.\n")
+        return G
+
+    node_attributes = {node: {
+        "x": round(node[0], 2), "y": round(node[1], 2), "stop": "True", "desc": []
+    } for node in list(G.nodes)}
+
+    for p1, p2, data in list(G.edges(data=True)):
+        transport_type = data["type"]
+        node_attributes[p1]["desc"].append(transport_type), node_attributes[p2]["desc"].append(transport_type)
+
+    for data in node_attributes.values():
+        data["desc"] = ", ".join(set(data["desc"]))
+    nx.set_node_attributes(G, node_attributes)
+    G = nx.convert_node_labels_to_integers(G)
+    G.graph['crs'] = 'epsg:' + str(city_crs)
+    G.graph['graph_type'] = "public transport graph"
+    G.graph.update({k + " speed": round(v, 2) for k, v in transport_types_speed.items()})
+
+    print("Public transport graph done!")
+    return G
+
+def public_routes_to_edges_from_file(city_crs, transport_type, speed, gdf_files):
+    edges = []
+    try:
+        gdf_stops = gpd.read_file(gdf_files.get("stops"))
+
+        gdf_routes = gpd.read_file(gdf_files.get("routes"))
+        ways: gpd.GeoDataFrame = gdf_routes[['route', 'geometry']].copy()
+        ways = ways.explode(index_parts=False).to_crs(city_crs).reset_index(drop=True)
+        ways["route"] = ways["route"].map(str).str.strip()
+
+        # в колонке route остановки через запятую перечислены все её маршруты
+        platforms = pd.DataFrame(
+            {"route": gdf_stops["route"].map(str).str.split(","), "platforms": gdf_stops.geometry.to_numpy()}
+            ).explode("route")
+        platforms["route"] = platforms["route"].str.strip()
+        platforms = platforms.groupby("route", sort=False)["platforms"].agg(list)
+
+        df_routes = ways.join(platforms, on="route")
+        df_routes = gpd.GeoDataFrame({
+            "way": df_routes.geometry.to_numpy(),
+            "platforms": df_routes["platforms"].map(lambda x: x if isinstance(x, list) else None),
+            }).set_geometry("way")
+
+        stop_points = df_routes.apply(lambda x: project_platforms(x, city_crs), axis=1)
+        edges = stop_points_to_edges(stop_points, transport_type, speed)
+    except KeyError:
+        print(f"! ! !\nThe 'route' column was not found in one of the files for \"{transport_type}\" . Please check their contents.\n! ! !")
+    except Exception as err:
+        print(f"! ! !\nFile with routes or with stops was not found for \"{transport_type}\", error:",err,"\n! ! !")
+    finally:
+        return edges
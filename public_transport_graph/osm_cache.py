@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+import typing
+
+
+class OSMCache:
+    """On-disk cache of Overpass responses and OSMnx graphs, every entry is a file named by the hash of its query.
+
+    Entries older than ``ttl`` seconds are fetched again. ``fixtures`` are directories with entries recorded
+    elsewhere (for example a copy of a cache directory), they are searched after ``directory`` and never expire.
+    In ``offline`` mode nothing is requested: cached entries are used regardless of their age and a missing one
+    raises ``FileNotFoundError``.
+    """
+
+    def __init__(
+        self,
+        directory: str = "osm_cache",
+        ttl: typing.Optional[float] = 24 * 3600,
+        offline: bool = False,
+        fixtures: typing.Sequence[str] = (),
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        self.fixtures = list(fixtures)
+
+    @staticmethod
+    def key(kind: str, query: dict) -> str:
+        payload = json.dumps({"kind": kind, "query": query}, sort_keys=True, ensure_ascii=False)
+        return f"{kind}_{hashlib.sha256(payload.encode('UTF-8')).hexdigest()}"
+
+    def _find(self, name: str) -> typing.Optional[str]:
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path) and (
+            self.offline or self.ttl is None or time.time() - os.path.getmtime(path) < self.ttl
+        ):
+            return path
+        for directory in self.fixtures:
+            if os.path.exists(os.path.join(directory, name)):
+                return os.path.join(directory, name)
+        return None
+
+    def _get(
+        self,
+        kind: str,
+        query: dict,
+        fetch: typing.Callable[[], typing.Any],
+        extension: str,
+        read,
+        write,
+        validate: typing.Optional[typing.Callable[[typing.Any], None]] = None,
+    ):
+        name = f"{self.key(kind, query)}.{extension}"
+        path = self._find(name)
+        if path is not None:
+            with open(path, "rb") as f:
+                return read(f)
+        if self.offline:
+            raise FileNotFoundError(
+                f"No cached {kind} entry {name} in {[self.directory, *self.fixtures]}, it can't be fetched offline"
+            )
+        value = fetch()
+        if validate is not None:
+            # ответ с ошибкой не кэшируется, иначе он возвращался бы до истечения ttl
+            validate(value)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        # прерванная запись не должна оставить в кэше обрезанный файл
+        with open(f"{path}.tmp", "wb") as f:
+            write(value, f)
+        os.replace(f"{path}.tmp", path)
+        return value
+
+    def get_json(
+        self,
+        kind: str,
+        query: dict,
+        fetch: typing.Callable[[], typing.Any],
+        validate: typing.Optional[typing.Callable[[typing.Any], None]] = None,
+    ) -> typing.Any:
+        """Returns the cached JSON response to ``query``, calling ``fetch`` and caching its result on a miss.
+
+        ``validate`` is called with a fetched response before it is cached and should raise if the response is an error.
+        """
+
+        def write(value, f):
+            f.write(json.dumps(value, ensure_ascii=False).encode("UTF-8"))
+
+        return self._get(kind, query, fetch, "json", json.load, write, validate)
+
+    def get_object(self, kind: str, query: dict, fetch: typing.Callable[[], typing.Any]) -> typing.Any:
+        """The same as ``get_json`` for objects that are not JSON (graphs), they are pickled,
+        so only fixtures from a trusted source should be used."""
+        return self._get(
+            kind, query, fetch, "pickle", pickle.load, lambda value, f: pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        )